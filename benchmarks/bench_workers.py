@@ -0,0 +1,253 @@
+"""Comparar os modos de worker do Gunicorn (sync, gthread, gevent).
+
+Para cada modo, sobe a aplicação com gunicorn.conf.py em um diretório de banco
+temporário, cria pets em duas clínicas e dispara clientes simultâneos com uma mistura
+de requisições (listagem de pets, cronograma de vacinações e login, que calcula hash
+de senha). Mede vazão e latências (p50/p95/p99) e verifica o isolamento das sessões:
+cada cliente deve ver apenas os pets da própria clínica, mesmo com requisições de
+clínicas diferentes atendidas ao mesmo tempo pelas mesmas threads/greenlets.
+
+Com --sse-streams N, mantém N streams /api/events abertos durante a carga (como abas do
+navegador abertas), para medir as requisições comuns enquanto os streams ocupam o servidor.
+Streams recusados com 503 (limite CUXINHO_SSE_MAX_STREAMS) são contados à parte; qualquer
+outra falha, inclusive exceções de conexão, timeout ou respostas que não são JSON, conta
+como erro.
+
+Uso (a partir da raiz do projeto, com gunicorn instalado):
+    python benchmarks/bench_workers.py --modes sync gthread gevent --clients 16 --duration 20
+    python benchmarks/bench_workers.py --modes sync gthread gevent --sse-streams 20
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TENANT = 'bench'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    def __init__(self, base_url, tenant=None):
+        self.base_url = base_url
+        self.tenant = tenant
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, data=None):
+        """Retorna (status, corpo JSON); falhas de conexão e respostas inválidas geram exceção"""
+        body = json.dumps(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                return response.status, json.loads(response.read() or b'null')
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+    def hold_stream(self, stop_at):
+        """Manter /api/events aberto até `stop_at`; retorna 'accepted', 'rejected' (503) ou 'error'"""
+        try:
+            self.login()
+            with self.opener.open(self.base_url + '/api/events', timeout=30) as response:
+                while time.time() < stop_at:
+                    if not response.readline():
+                        return 'error'  # o servidor encerrou o stream antes do fim
+            return 'accepted'
+        except urllib.error.HTTPError as error:
+            return 'rejected' if error.code == 503 else 'error'
+        except Exception:
+            return 'error'
+
+    def login(self):
+        payload = {'username': 'admin', 'password': 'admin123'}
+        if self.tenant:
+            payload['tenant'] = self.tenant
+        return self.request('POST', '/api/auth/login', payload)
+
+
+def start_server(mode, database_dir, port, workers):
+    env = dict(os.environ, CUXINHO_DATABASE_DIR=database_dir, CUXINHO_WORKER_MODE=mode,
+               CUXINHO_BIND=f'127.0.0.1:{port}', CUXINHO_ACCESS_LOG='/dev/null',
+               CUXINHO_ERROR_LOG=os.path.join(database_dir, 'gunicorn-error.log'))
+    if workers:
+        env['CUXINHO_WORKERS'] = str(workers)
+
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'src.main', 'tenant', 'create', TENANT,
+                    '--name', 'Benchmark'], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/api/auth/check-session', timeout=1)
+            return process, base_url
+        except OSError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError(f'Servidor no modo {mode} não respondeu')
+
+
+def seed(base_url, pets):
+    for tenant, prefix in ((None, 'default'), (TENANT, TENANT)):
+        client = Client(base_url, tenant)
+        client.login()
+        for i in range(pets):
+            status, pet = client.request('POST', '/api/pets', {
+                'name': f'{prefix}-{i}', 'species': random.choice(['dog', 'cat']),
+                'owner_name': f'Owner {i % 50}', 'owner_phone': f'1190000{i % 50:04d}'
+            })
+            if i % 3 == 0:
+                client.request('POST', f"/api/pets/{pet['id']}/vaccinations", {
+                    'vaccine_name': 'V10', 'vaccine_type': 'V10',
+                    'application_date': '2026-01-01', 'next_dose_date': time.strftime('%Y-%m-%d')
+                })
+
+
+def run_load(base_url, clients, duration, sse_streams=0):
+    latencies, errors, violations = [], [0], [0]
+    streams = {'accepted': 0, 'rejected': 0, 'error': 0}
+    lock = threading.Lock()
+
+    # Streams abertos antes da carga e mantidos até o fim dela
+    stream_stop_at = time.time() + duration + 5
+    stream_threads = []
+    for index in range(sse_streams):
+        client = Client(base_url, TENANT if index % 2 else None)
+
+        def hold(client=client):
+            outcome = client.hold_stream(stream_stop_at)
+            with lock:
+                streams[outcome] += 1
+
+        stream_threads.append(threading.Thread(target=hold, daemon=True))
+        stream_threads[-1].start()
+    if sse_streams:
+        time.sleep(1)
+    stop_at = time.time() + duration
+
+    def one_request(client, prefix):
+        roll = random.random()
+        if roll < 0.7:
+            status, body = client.request('GET', '/api/pets')
+            return status, status == 200 and any(not p['name'].startswith(prefix + '-') for p in body)
+        if roll < 0.9:
+            status, body = client.request('GET', '/api/reports/vaccination-schedule')
+            return status, status == 200 and any(not p['pet_name'].startswith(prefix + '-') for p in body)
+        status, _ = client.login()
+        return status, False
+
+    def worker(index):
+        tenant = TENANT if index % 2 else None
+        prefix = TENANT if tenant else 'default'
+        client = Client(base_url, tenant)
+        logged_in = False
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            try:
+                if logged_in:
+                    status, leaked = one_request(client, prefix)
+                else:
+                    status, leaked = client.login()[0], False
+                    logged_in = status == 200
+            except Exception:
+                # Reset de conexão, timeout, corpo que não é JSON etc. também são erros
+                status, leaked = None, False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400:
+                    errors[0] += 1
+                if leaked:
+                    violations[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    for thread in stream_threads:
+        thread.join(timeout=60)
+
+    latencies.sort()
+    def percentile(p):
+        if not latencies:
+            return float('nan')
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors[0] + streams['error'],
+        'isolation_violations': violations[0],
+        'streams_accepted': streams['accepted'],
+        'streams_rejected': streams['rejected'],
+        'throughput': len(latencies) / wall,
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['sync', 'gthread'], choices=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=int, default=20, help='segundos de carga por modo')
+    parser.add_argument('--pets', type=int, default=300, help='pets criados em cada clínica')
+    parser.add_argument('--workers', type=int, default=None, help='processos (padrão: o de cada modo)')
+    parser.add_argument('--sse-streams', type=int, default=0, help='streams /api/events mantidos abertos durante a carga')
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        database_dir = tempfile.mkdtemp(prefix=f'cuxinho-bench-{mode}-')
+        process = None
+        try:
+            process, base_url = start_server(mode, database_dir, free_port(), args.workers)
+            seed(base_url, args.pets)
+            results[mode] = run_load(base_url, args.clients, args.duration, args.sse_streams)
+        finally:
+            if process:
+                # Streams SSE abertos seguram o encerramento até o graceful_timeout do gunicorn
+                process.terminate()
+                try:
+                    process.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            shutil.rmtree(database_dir, ignore_errors=True)
+
+    print(f'\n{args.clients} clientes, {args.duration}s por modo, {args.pets} pets por clínica, '
+          f'{args.sse_streams} streams SSE abertos, {os.cpu_count()} CPUs\n')
+    print('| modo | requisições | erros | violações de isolamento | streams aceitos/recusados | req/s | p50 (ms) | p95 (ms) | p99 (ms) |')
+    print('|---|---|---|---|---|---|---|---|---|')
+    for mode, r in results.items():
+        print(f"| {mode} | {r['requests']} | {r['errors']} | {r['isolation_violations']} | "
+              f"{r['streams_accepted']}/{r['streams_rejected']} | "
+              f"{r['throughput']:.1f} | {r['p50']:.1f} | {r['p95']:.1f} | {r['p99']:.1f} |")
+
+    if any(r['errors'] or r['isolation_violations'] or not r['requests'] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Configuração do Gunicorn para o Cuxinho
+#
+# O modo de execução é escolhido pela variável CUXINHO_WORKER_MODE:
+#   sync    - um processo atende uma requisição por vez (padrão, equivale ao antigo -w 4)
+#   gthread - cada processo atende várias requisições em threads
+#   gevent  - cada processo atende muitas conexões em greenlets (requer o pacote gevent);
+#             útil com muitos streams SSE abertos, mas as chamadas ao SQLite bloqueiam o
+#             processo enquanto executam
+#
+# Uso: gunicorn -c gunicorn.conf.py src.main:app
+import os
+
+worker_mode = os.environ.get('CUXINHO_WORKER_MODE', 'sync')
+if worker_mode not in ('sync', 'gthread', 'gevent'):
+    raise RuntimeError(f'CUXINHO_WORKER_MODE inválido: {worker_mode} (use sync, gthread ou gevent)')
+
+bind = os.environ.get('CUXINHO_BIND', '0.0.0.0:50000')
+worker_class = worker_mode
+
+if worker_mode == 'sync':
+    workers = int(os.environ.get('CUXINHO_WORKERS', 4))
+elif worker_mode == 'gthread':
+    # Menos processos e mais threads: menos memória e menos disputa pelo lock de escrita do SQLite
+    workers = int(os.environ.get('CUXINHO_WORKERS', 2))
+    threads = int(os.environ.get('CUXINHO_THREADS', 8))
+else:
+    workers = int(os.environ.get('CUXINHO_WORKERS', 2))
+    worker_connections = int(os.environ.get('CUXINHO_WORKER_CONNECTIONS', 200))
+
+# O pool de conexões de cada processo deve comportar as requisições simultâneas dele
+os.environ.setdefault('CUXINHO_DB_POOL_SIZE', str(
+    threads if worker_mode == 'gthread' else 10
+))
+
+# Streams SSE por processo. Cada stream prende um worker sync inteiro (e esbarraria no timeout),
+# então o modo sync não os aceita; no gthread metade das threads fica livre para as demais
+# requisições. Acima do limite /api/events responde 503 e o navegador consulta periodicamente.
+if worker_mode == 'sync':
+    os.environ.setdefault('CUXINHO_SSE_MAX_STREAMS', '0')
+elif worker_mode == 'gthread':
+    os.environ.setdefault('CUXINHO_SSE_MAX_STREAMS', str(threads // 2))
+else:
+    os.environ.setdefault('CUXINHO_SSE_MAX_STREAMS', str(worker_connections // 2))
+
+timeout = int(os.environ.get('CUXINHO_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+errorlog = os.environ.get('CUXINHO_ERROR_LOG', '-')
+accesslog = os.environ.get('CUXINHO_ACCESS_LOG', '-')
@@ -5,6 +5,9 @@
 # --- Configurações --- 
 APP_DIR="/opt/cuxinho"
 PYTHON_VERSION="python3.11"
+# Modo dos workers do Gunicorn: sync (um request por processo, padrão), gthread (threads)
+# ou gevent (greenlets). Pode ser definido ao executar: WORKER_MODE=gthread ./install_cuxinho_rocky_linux.sh
+WORKER_MODE="${WORKER_MODE:-sync}"
 
 # --- Funções Auxiliares ---
 log_info() {
@@ -16,6 +19,11 @@ log_error() {
     exit 1
 }
 
+case "$WORKER_MODE" in
+    sync|gthread|gevent) ;;
+    *) log_error "WORKER_MODE inválido: $WORKER_MODE (use sync, gthread ou gevent)." ;;
+esac
+
 # --- 1. Atualizar o sistema ---
 log_info "Atualizando pacotes do sistema..."
 sudo apt update -y && sudo apt upgrade -y || log_error "Falha ao atualizar o sistema."
@@ -62,6 +70,10 @@ sudo "$APP_DIR/venv/bin/pip" install -r "$APP_DIR/requirements.txt" || log_error
 # --- 8. Instalar Gunicorn ---
 log_info "Instalando Gunicorn no ambiente virtual..."
 sudo "$APP_DIR/venv/bin/pip" install gunicorn || log_error "Falha ao instalar Gunicorn."
+if [ "$WORKER_MODE" = "gevent" ]; then
+    log_info "Instalando gevent para o modo de workers gevent..."
+    sudo "$APP_DIR/venv/bin/pip" install gevent || log_error "Falha ao instalar gevent."
+fi
 
 # --- 9. Inicializar o banco de dados (se necessário) ---
 log_info "Inicializando o banco de dados (se necessário)..."
@@ -84,7 +96,7 @@ sudo fuser -k 50000/tcp || true # Mata qualquer processo usando a porta 50000
 sleep 2 # Pequena pausa para garantir que a porta seja liberada
 
 # --- 10. Configurar serviço Systemd ---
-log_info "Configurando serviço Systemd para o Cuxinho..."
+log_info "Configurando serviço Systemd para o Cuxinho (workers: $WORKER_MODE)..."
 
 SERVICE_FILE="/etc/systemd/system/cuxinho.service"
 sudo bash -c "cat > $SERVICE_FILE <<EOF
@@ -96,16 +108,46 @@ After=network.target
 User=cuxinho_user
 Group=cuxinho_user
 WorkingDirectory=$APP_DIR
-ExecStart=$APP_DIR/venv/bin/gunicorn -w 4 -b 0.0.0.0:50000 src.main:app --error-logfile /var/log/cuxinho/gunicorn-error.log --access-logfile /var/log/cuxinho/gunicorn-access.log
+Environment=CUXINHO_WORKER_MODE=$WORKER_MODE
+Environment=CUXINHO_BIND=0.0.0.0:50000
+Environment=CUXINHO_ERROR_LOG=/var/log/cuxinho/gunicorn-error.log
+Environment=CUXINHO_ACCESS_LOG=/var/log/cuxinho/gunicorn-access.log
+ExecStart=$APP_DIR/venv/bin/gunicorn -c $APP_DIR/gunicorn.conf.py src.main:app
 Restart=always
 
 [Install]
 WantedBy=multi-user.target
 EOF"
 
+# Os relatórios de cobertura e atividade leem apenas os rollups; este timer os atualiza
+log_info "Configurando timer Systemd de atualização dos relatórios..."
+sudo bash -c "cat > /etc/systemd/system/cuxinho-analytics.service <<EOF
+[Unit]
+Description=Cuxinho - atualização dos rollups de relatórios
+
+[Service]
+Type=oneshot
+User=cuxinho_user
+Group=cuxinho_user
+WorkingDirectory=$APP_DIR
+ExecStart=$APP_DIR/venv/bin/flask --app src.main refresh-analytics --all-tenants
+EOF"
+sudo bash -c "cat > /etc/systemd/system/cuxinho-analytics.timer <<EOF
+[Unit]
+Description=Atualizar os relatórios do Cuxinho a cada 5 minutos
+
+[Timer]
+OnBootSec=1min
+OnUnitActiveSec=5min
+
+[Install]
+WantedBy=timers.target
+EOF"
+
 sudo systemctl daemon-reload || log_error "Falha ao recarregar daemon do Systemd."
 sudo systemctl enable cuxinho || log_error "Falha ao habilitar serviço cuxinho."
 sudo systemctl start cuxinho || log_error "Falha ao iniciar serviço cuxinho."
+sudo systemctl enable --now cuxinho-analytics.timer || log_error "Falha ao habilitar timer cuxinho-analytics."
 
 log_info "Verificando status do serviço Cuxinho..."
 sudo systemctl status cuxinho
@@ -3,12 +3,23 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory
-from src.models.user import db, User
-from src.models.pet import Pet, Vaccination, ParasiticControl
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db, schema_lock, User
+from src.models.pet import Owner, Pet, Vaccination, ParasiticControl
+from src.models.analytics import refresh_rollups
+from src.models.audit import audit_writer
+from src.models.tenant import Tenant, init_tenancy, use_tenant, find_tenant, create_tenant, migrate_tenant_database, move_tenant
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.pet import pet_bp
+from src.routes.owner import owner_bp
+from src.routes.report import report_bp
+from src.routes.sync import sync_bp
+from src.routes.events import events_bp
+from src.routes.audit import audit_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'cuxinho_secret_key_2024_#FGSgvasgf$5$WGT'
@@ -19,11 +30,35 @@ app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hora
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(pet_bp, url_prefix='/api')
+app.register_blueprint(owner_bp, url_prefix='/api')
+app.register_blueprint(report_bp, url_prefix='/api')
+app.register_blueprint(sync_bp, url_prefix='/api')
+app.register_blueprint(events_bp, url_prefix='/api')
+app.register_blueprint(audit_bp, url_prefix='/api')
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# O banco padrão atende a clínica 'default'; as demais clínicas ficam em TENANT_DATABASE_DIR
+# e o registro de clínicas no bind 'tenants'
+DATABASE_DIR = os.environ.get('CUXINHO_DATABASE_DIR', os.path.join(os.path.dirname(__file__), 'database'))
+app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'app.db')}"
+app.config['SQLALCHEMY_BINDS'] = {
+    'tenants': f"sqlite:///{os.path.join(DATABASE_DIR, 'tenants.db')}"
+}
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool por processo: deve comportar as threads (gthread) ou greenlets (gevent) simultâneos
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.environ.get('CUXINHO_DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.environ.get('CUXINHO_DB_MAX_OVERFLOW', 20)),
+    'pool_timeout': 30
+}
+app.config['TENANT_DATABASE_DIR'] = os.path.join(DATABASE_DIR, 'tenants')
+app.config['TENANT_ENGINE_CACHE_SIZE'] = 16  # máximo de bancos de clínicas abertos por processo
+# Streams SSE simultâneos por processo; 0 desativa (o gunicorn.conf.py ajusta conforme o modo dos workers)
+app.config['SSE_MAX_STREAMS'] = int(os.environ.get('CUXINHO_SSE_MAX_STREAMS', 8))
+# Registros de auditoria que não puderam ser gravados no banco (reaplicados na inicialização)
+app.config['AUDIT_FALLBACK_PATH'] = os.path.join(DATABASE_DIR, 'audit-fallback.jsonl')
 db.init_app(app)
+init_tenancy(app)
 
 def create_admin_user():
     """Criar usuário administrador padrão se não existir"""
@@ -37,13 +72,91 @@ def create_admin_user():
         )
         admin.set_password('admin123')
         db.session.add(admin)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Outro worker iniciado ao mesmo tempo já criou o administrador
+            db.session.rollback()
+            return
         print("Usuário administrador criado: admin / admin123")
 
+# Cada worker do gunicorn executa este bloco ao iniciar; as migrações obtêm o lock de escrita
+# do banco (ver schema_lock), então apenas o primeiro altera o esquema
 with app.app_context():
-    db.create_all()
+    with schema_lock(db.engines['tenants']) as connection:
+        db.metadatas['tenants'].create_all(bind=connection)
+    migrate_tenant_database(db.engine)
+    audit_writer.init_app(app)
     create_admin_user()
 
+@app.cli.command('refresh-analytics')
+@click.option('--tenant', 'tenant_slug', default=None, help='Clínica (padrão: banco principal)')
+@click.option('--all-tenants', is_flag=True, help='Banco principal e todas as clínicas ativas')
+def refresh_analytics_command(tenant_slug, all_tenants):
+    """Atualizar os rollups de vacinação (agendado pelo timer cuxinho-analytics do systemd)"""
+    if all_tenants:
+        slugs = [None] + [t.slug for t in Tenant.query.filter_by(active=True).order_by(Tenant.slug)]
+    else:
+        if tenant_slug and find_tenant(tenant_slug) is None:
+            raise click.ClickException(f'Clínica não encontrada: {tenant_slug}')
+        slugs = [tenant_slug]
+    for slug in slugs:
+        use_tenant(find_tenant(slug))
+        state = refresh_rollups()
+        print(f"{slug or 'default'}: rollups atualizados até a alteração "
+              f"{state.last_change_id} ({state.refreshed_at.isoformat()})")
+        # Cada clínica usa uma engine diferente; a próxima começa com uma sessão nova
+        db.session.remove()
+
+# Administração de clínicas (tenants)
+tenant_cli = AppGroup('tenant', help='Administração das clínicas hospedadas')
+
+@tenant_cli.command('list')
+def list_tenants_command():
+    for tenant in Tenant.query.order_by(Tenant.slug).all():
+        status = 'ativa' if tenant.active else 'manutenção'
+        print(f"{tenant.slug}\t{tenant.name}\t{status}\t{tenant.database_path}")
+
+@tenant_cli.command('create')
+@click.argument('slug')
+@click.option('--name', required=True, help='Nome da clínica')
+def create_tenant_command(slug, name):
+    try:
+        tenant = create_tenant(slug, name, app.config['TENANT_DATABASE_DIR'])
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    use_tenant(tenant)
+    create_admin_user()
+    print(f"Clínica criada: {tenant.slug} ({tenant.database_path})")
+
+@tenant_cli.command('migrate')
+@click.argument('slug', required=False)
+def migrate_tenant_command(slug):
+    """Aplicar o esquema atual ao banco de uma clínica (ou de todas)"""
+    tenants = [find_tenant(slug)] if slug else Tenant.query.all()
+    if slug and tenants[0] is None:
+        raise click.ClickException(f'Clínica não encontrada: {slug}')
+    for tenant in tenants:
+        use_tenant(tenant)
+        migrate_tenant_database(db.session.get_bind())
+        print(f"Clínica migrada: {tenant.slug}")
+
+@tenant_cli.command('move')
+@click.argument('slug')
+@click.argument('database_path')
+def move_tenant_command(slug, database_path):
+    """Mover o banco de uma clínica para outro arquivo"""
+    tenant = find_tenant(slug)
+    if tenant is None:
+        raise click.ClickException(f'Clínica não encontrada: {slug}')
+    try:
+        move_tenant(tenant, os.path.abspath(database_path))
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    print(f"Clínica {tenant.slug} movida para {tenant.database_path}")
+
+app.cli.add_command(tenant_cli)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
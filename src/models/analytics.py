@@ -0,0 +1,305 @@
+from datetime import datetime, date
+from sqlalchemy import event, func, inspect
+from src.models.user import db, schema_lock
+from src.models.pet import Pet, Vaccination
+
+# Tipo usado nas agregações: vaccine_type ou, se ausente ou vazio (a interface envia ''),
+# vaccine_name. VACCINE_KEY (SQL) e vaccine_key (Python) devem seguir a mesma regra
+VACCINE_KEY = func.coalesce(func.nullif(Vaccination.vaccine_type, ''), Vaccination.vaccine_name)
+
+
+def vaccine_key(vaccination):
+    return vaccination.vaccine_type or vaccination.vaccine_name
+
+
+class AnalyticsChangeLog(db.Model):
+    """Registro de alterações pendentes de processamento pelos rollups"""
+    __tablename__ = 'analytics_change_log'
+    # Ids não podem ser reutilizados após a limpeza do log
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # 'vaccination' ou 'pet'
+    entity_id = db.Column(db.Integer, nullable=False)
+    pet_id = db.Column(db.Integer)
+    day = db.Column(db.Date)  # data de aplicação afetada (vacinações)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class AnalyticsState(db.Model):
+    """Marca até onde o log de alterações já foi aplicado"""
+    __tablename__ = 'analytics_state'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_change_id = db.Column(db.Integer, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime)
+    as_of = db.Column(db.Date)  # data usada no cálculo de cobertura/atrasos
+
+
+class VaccinationDailyRollup(db.Model):
+    __tablename__ = 'vaccination_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+    vaccine_type = db.Column(db.String(100), primary_key=True)
+    veterinarian = db.Column(db.String(100), primary_key=True)
+    doses = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'vaccine_type': self.vaccine_type,
+            'veterinarian': self.veterinarian,
+            'doses': self.doses
+        }
+
+
+class VaccinationMonthlyRollup(db.Model):
+    __tablename__ = 'vaccination_monthly_rollup'
+
+    month = db.Column(db.String(7), primary_key=True)  # 'YYYY-MM'
+    vaccine_type = db.Column(db.String(100), primary_key=True)
+    doses = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'vaccine_type': self.vaccine_type,
+            'doses': self.doses
+        }
+
+
+class PetVaccineStatus(db.Model):
+    """Última aplicação de cada tipo de vacina por pet"""
+    __tablename__ = 'pet_vaccine_status'
+
+    pet_id = db.Column(db.Integer, primary_key=True)
+    vaccine_type = db.Column(db.String(100), primary_key=True)
+    veterinarian = db.Column(db.String(100))
+    last_application_date = db.Column(db.Date)
+    next_dose_date = db.Column(db.Date)
+
+
+class VaccineCoverageRollup(db.Model):
+    __tablename__ = 'vaccine_coverage_rollup'
+
+    species = db.Column(db.String(20), primary_key=True)
+    vaccine_type = db.Column(db.String(100), primary_key=True)
+    active_pets = db.Column(db.Integer, nullable=False, default=0)
+    up_to_date = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'species': self.species,
+            'vaccine_type': self.vaccine_type,
+            'active_pets': self.active_pets,
+            'up_to_date': self.up_to_date,
+            'overdue': self.overdue,
+            'coverage_rate': round(self.up_to_date / self.active_pets, 4) if self.active_pets else 0.0
+        }
+
+
+class VeterinarianOverdueRollup(db.Model):
+    __tablename__ = 'veterinarian_overdue_rollup'
+
+    veterinarian = db.Column(db.String(100), primary_key=True)
+    tracked = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'veterinarian': self.veterinarian,
+            'tracked': self.tracked,
+            'overdue': self.overdue,
+            'overdue_rate': round(self.overdue / self.tracked, 4) if self.tracked else 0.0
+        }
+
+
+# LOG DE ALTERAÇÕES
+def _log_change(connection, entity, entity_id, pet_id=None, day=None):
+    connection.execute(AnalyticsChangeLog.__table__.insert().values(
+        entity=entity,
+        entity_id=entity_id,
+        pet_id=pet_id,
+        day=day,
+        created_at=datetime.utcnow()
+    ))
+
+
+@event.listens_for(Vaccination, 'after_insert')
+@event.listens_for(Vaccination, 'after_delete')
+def _vaccination_changed(mapper, connection, target):
+    _log_change(connection, 'vaccination', target.id, target.pet_id, target.application_date)
+
+
+@event.listens_for(Vaccination, 'after_update')
+def _vaccination_updated(mapper, connection, target):
+    _log_change(connection, 'vaccination', target.id, target.pet_id, target.application_date)
+    # Se a data de aplicação mudou, o dia antigo também precisa ser recalculado
+    for old_day in inspect(target).attrs.application_date.history.deleted:
+        if old_day and old_day != target.application_date:
+            _log_change(connection, 'vaccination', target.id, target.pet_id, old_day)
+
+
+@event.listens_for(Pet, 'after_insert')
+@event.listens_for(Pet, 'after_update')
+def _pet_changed(mapper, connection, target):
+    _log_change(connection, 'pet', target.id, target.id)
+
+
+# ATUALIZAÇÃO INCREMENTAL DOS ROLLUPS
+def ensure_analytics_indexes(engine=None):
+    """Criar em bancos já existentes os índices usados pela atualização incremental"""
+    engine = engine or db.engine
+    with schema_lock(engine) as connection:
+        for index in Vaccination.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _refresh_daily(days):
+    if not days:
+        return
+    VaccinationDailyRollup.query.filter(VaccinationDailyRollup.day.in_(days)).delete(synchronize_session=False)
+    veterinarian = func.coalesce(Vaccination.veterinarian, '')
+    rows = db.session.query(
+        Vaccination.application_date, VACCINE_KEY, veterinarian, func.count(Vaccination.id)
+    ).filter(Vaccination.application_date.in_(days)).group_by(
+        Vaccination.application_date, VACCINE_KEY, veterinarian
+    ).all()
+    for day, vaccine_type, vet, doses in rows:
+        db.session.add(VaccinationDailyRollup(day=day, vaccine_type=vaccine_type, veterinarian=vet, doses=doses))
+    db.session.flush()
+
+
+def _refresh_monthly(days):
+    months = {(d.year, d.month) for d in days}
+    for year, month in months:
+        key = f'{year:04d}-{month:02d}'
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        VaccinationMonthlyRollup.query.filter_by(month=key).delete(synchronize_session=False)
+        rows = db.session.query(
+            VaccinationDailyRollup.vaccine_type, func.sum(VaccinationDailyRollup.doses)
+        ).filter(
+            VaccinationDailyRollup.day >= start, VaccinationDailyRollup.day < end
+        ).group_by(VaccinationDailyRollup.vaccine_type).all()
+        for vaccine_type, doses in rows:
+            db.session.add(VaccinationMonthlyRollup(month=key, vaccine_type=vaccine_type, doses=doses))
+    db.session.flush()
+
+
+def _refresh_pet_status(pet_ids):
+    if not pet_ids:
+        return
+    pet_ids = list(pet_ids)
+    PetVaccineStatus.query.filter(PetVaccineStatus.pet_id.in_(pet_ids)).delete(synchronize_session=False)
+    vaccinations = Vaccination.query.filter(Vaccination.pet_id.in_(pet_ids)).order_by(
+        Vaccination.application_date, Vaccination.id
+    ).all()
+    latest = {}
+    for vaccination in vaccinations:
+        latest[(vaccination.pet_id, vaccine_key(vaccination))] = vaccination
+    for (pet_id, vaccine_type), vaccination in latest.items():
+        db.session.add(PetVaccineStatus(
+            pet_id=pet_id,
+            vaccine_type=vaccine_type,
+            veterinarian=vaccination.veterinarian or '',
+            last_application_date=vaccination.application_date,
+            next_dose_date=vaccination.next_dose_date
+        ))
+    db.session.flush()
+
+
+def _refresh_summaries(today):
+    VaccineCoverageRollup.query.delete(synchronize_session=False)
+    VeterinarianOverdueRollup.query.delete(synchronize_session=False)
+
+    active_pets = dict(db.session.query(Pet.species, func.count(Pet.id)).filter(
+        Pet.active == True
+    ).group_by(Pet.species).all())
+
+    statuses = db.session.query(PetVaccineStatus, Pet.species).join(
+        Pet, Pet.id == PetVaccineStatus.pet_id
+    ).filter(Pet.active == True).all()
+
+    coverage = {}
+    veterinarians = {}
+    for status, species in statuses:
+        overdue = status.next_dose_date is not None and status.next_dose_date < today
+        counts = coverage.setdefault((species, status.vaccine_type), [0, 0])
+        counts[1 if overdue else 0] += 1
+        vet_counts = veterinarians.setdefault(status.veterinarian, [0, 0])
+        vet_counts[0] += 1
+        if overdue:
+            vet_counts[1] += 1
+
+    for (species, vaccine_type), (up_to_date, overdue) in coverage.items():
+        db.session.add(VaccineCoverageRollup(
+            species=species,
+            vaccine_type=vaccine_type,
+            active_pets=active_pets.get(species, 0),
+            up_to_date=up_to_date,
+            overdue=overdue
+        ))
+    for veterinarian, (tracked, overdue) in veterinarians.items():
+        db.session.add(VeterinarianOverdueRollup(veterinarian=veterinarian, tracked=tracked, overdue=overdue))
+    db.session.flush()
+
+
+def get_analytics_state():
+    return db.session.get(AnalyticsState, 'vaccination')
+
+
+def refresh_rollups(full=False):
+    """Aplicar aos rollups as alterações registradas desde a última execução.
+
+    Na primeira execução (ou com full=True) todos os rollups são reconstruídos.
+    Retorna o estado atualizado.
+    """
+    today = date.today()
+    now = datetime.utcnow()
+    state = get_analytics_state()
+    if state is None:
+        state = AnalyticsState(name='vaccination', last_change_id=0)
+        db.session.add(state)
+        full = True
+
+    last_change_id = db.session.query(func.max(AnalyticsChangeLog.id)).scalar() or 0
+    changes = []
+    if not full and last_change_id > state.last_change_id:
+        changes = AnalyticsChangeLog.query.filter(
+            AnalyticsChangeLog.id > state.last_change_id,
+            AnalyticsChangeLog.id <= last_change_id
+        ).all()
+
+    # Linhas inseridas fora do ORM não passam pelos eventos; o created_at as captura
+    inserted = []
+    if not full and state.refreshed_at:
+        inserted = db.session.query(Vaccination.pet_id, Vaccination.application_date).filter(
+            Vaccination.created_at >= state.refreshed_at
+        ).all()
+
+    if not full and not changes and not inserted and state.as_of == today:
+        return state
+
+    if full:
+        VaccinationDailyRollup.query.delete(synchronize_session=False)
+        VaccinationMonthlyRollup.query.delete(synchronize_session=False)
+        PetVaccineStatus.query.delete(synchronize_session=False)
+        days = {d for (d,) in db.session.query(Vaccination.application_date).distinct()}
+        pet_ids = {p for (p,) in db.session.query(Vaccination.pet_id).distinct()}
+    else:
+        days = {c.day for c in changes if c.day} | {d for _, d in inserted}
+        pet_ids = {c.pet_id for c in changes if c.entity == 'vaccination' and c.pet_id} | {p for p, _ in inserted}
+
+    _refresh_daily(days)
+    _refresh_monthly(days)
+    _refresh_pet_status(pet_ids)
+    _refresh_summaries(today)
+
+    AnalyticsChangeLog.query.filter(AnalyticsChangeLog.id <= last_change_id).delete(synchronize_session=False)
+    state.last_change_id = last_change_id
+    state.refreshed_at = now
+    state.as_of = today
+    db.session.commit()
+    return state
@@ -0,0 +1,246 @@
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, date
+from flask import has_request_context, session as flask_session
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from src.models.user import db, User
+from src.models.pet import Owner, Pet, Vaccination, ParasiticControl
+
+# Entidades auditadas
+AUDITED_ENTITIES = {
+    Owner: 'owner',
+    Pet: 'pet',
+    Vaccination: 'vaccination',
+    ParasiticControl: 'parasitic_control',
+    User: 'user'
+}
+# Colunas técnicas que não interessam à auditoria
+IGNORED_COLUMNS = {'updated_at', 'change_seq', 'last_login', 'phone_normalized', 'email_normalized'}
+# Colunas cujo valor nunca é gravado, apenas o fato de terem mudado
+MASKED_COLUMNS = {'password_hash'}
+
+
+class AuditLog(db.Model):
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        db.Index('ix_audit_log_entity', 'entity', 'entity_id', 'id'),
+        db.Index('ix_audit_log_user', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer)
+    username = db.Column(db.String(80))
+    action = db.Column(db.String(10), nullable=False)  # 'create', 'update' ou 'delete'
+    entity = db.Column(db.String(30), nullable=False)
+    entity_id = db.Column(db.Integer)
+    changes = db.Column(db.Text, nullable=False, default='{}')  # {coluna: [antes, depois]}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'user_id': self.user_id,
+            'username': self.username,
+            'action': self.action,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'changes': json.loads(self.changes)
+        }
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _diff(obj, action):
+    changes = {}
+    for attr in inspect(obj).mapper.column_attrs:
+        key = attr.key
+        if key in IGNORED_COLUMNS:
+            continue
+        if action == 'update':
+            history = inspect(obj).attrs[key].history
+            if not history.has_changes():
+                continue
+            before = history.deleted[0] if history.deleted else None
+            after = history.added[0] if history.added else None
+            if before == after:
+                continue
+        else:
+            value = getattr(obj, key)
+            before, after = (None, value) if action == 'create' else (value, None)
+        if key in MASKED_COLUMNS:
+            before, after = ('***' if before else None), ('***' if after else None)
+        changes[key] = [_serialize(before), _serialize(after)]
+    return changes
+
+
+# CAPTURA VIA EVENTOS DE SESSÃO
+@event.listens_for(Session, 'after_flush')
+def _capture_changes(session, flush_context):
+    user_id = username = None
+    if has_request_context():
+        user_id = flask_session.get('user_id')
+        username = flask_session.get('username')
+
+    now = datetime.utcnow()
+    pending = session.info.setdefault('pending_audit', [])
+    for action, objects in (('create', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            entity = AUDITED_ENTITIES.get(type(obj))
+            if entity is None:
+                continue
+            changes = _diff(obj, action)
+            if action == 'update' and not changes:
+                continue
+            pending.append((session.get_bind(inspect(obj).mapper), {
+                'created_at': now,
+                'user_id': user_id,
+                'username': username,
+                'action': action,
+                'entity': entity,
+                'entity_id': obj.id,
+                'changes': json.dumps(changes)
+            }))
+
+
+@event.listens_for(Session, 'after_commit')
+def _enqueue_committed(session):
+    pending = session.info.pop('pending_audit', None)
+    if pending:
+        audit_writer.enqueue(pending)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back(session, previous_transaction):
+    session.info.pop('pending_audit', None)
+
+
+# GRAVAÇÃO EM SEGUNDO PLANO
+class AuditWriter:
+    """Acumula os registros de auditoria em memória e os grava em lotes.
+
+    As rotas não esperam pela gravação: uma thread por processo grava os lotes a cada
+    `flush_interval` segundos (ou ao atingir `batch_size`), em uma única transação por
+    banco. O que estiver pendente é gravado no encerramento do processo; se a gravação
+    falhar, os registros vão para `fallback_path` (JSON Lines), reaplicado na próxima
+    inicialização.
+    """
+
+    def __init__(self, flush_interval=2.0, batch_size=200):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fallback_path = None
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        self.fallback_path = app.config['AUDIT_FALLBACK_PATH']
+        self.replay_fallback()
+        atexit.register(self.shutdown)
+
+    def _ensure_started(self):
+        # Workers do gunicorn são criados por fork; cada processo precisa da sua thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, entries):
+        with self._lock:
+            self._ensure_started()
+            self._buffer.extend(entries)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Gravar tudo o que está pendente; usado também antes das consultas de auditoria"""
+        with self._flush_lock:
+            with self._lock:
+                entries = list(self._buffer)
+                self._buffer.clear()
+            if not entries:
+                return
+
+            batches = {}
+            for engine, row in entries:
+                batches.setdefault(engine, []).append(row)
+            for engine, rows in batches.items():
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(AuditLog.__table__.insert(), rows)
+                except Exception as error:
+                    print(f"Erro ao gravar auditoria, usando arquivo de contingência: {error}")
+                    self._write_fallback(engine, rows)
+
+    def _write_fallback(self, engine, rows):
+        if not self.fallback_path:
+            return
+        database = engine.url.render_as_string(hide_password=False)
+        with open(self.fallback_path, 'a', encoding='utf-8') as fallback:
+            for row in rows:
+                fallback.write(json.dumps({'database': database, **row}, default=_serialize) + '\n')
+            fallback.flush()
+            os.fsync(fallback.fileno())
+
+    def replay_fallback(self):
+        """Gravar nos bancos os registros deixados no arquivo de contingência"""
+        if not self.fallback_path or not os.path.exists(self.fallback_path):
+            return
+        processing_path = f'{self.fallback_path}.{os.getpid()}'
+        try:
+            os.rename(self.fallback_path, processing_path)
+        except FileNotFoundError:
+            return  # outro worker já está reaplicando o arquivo
+
+        batches = {}
+        with open(processing_path, encoding='utf-8') as fallback:
+            for line in fallback:
+                if line.strip():
+                    row = json.loads(line)
+                    row['created_at'] = datetime.fromisoformat(row['created_at'])
+                    batches.setdefault(row.pop('database'), []).append(row)
+
+        for database, rows in batches.items():
+            path = make_url(database).database
+            if path and not os.path.exists(path):
+                # Banco removido (ex.: clínica movida); create_engine criaria um arquivo vazio
+                print(f"Banco de auditoria não encontrado, mantendo registros no arquivo de contingência: {database}")
+                self._write_fallback(create_engine(database), rows)
+                continue
+            engine = create_engine(database)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(AuditLog.__table__.insert(), rows)
+            except Exception as error:
+                print(f"Erro ao reaplicar auditoria de {database}: {error}")
+                self._write_fallback(engine, rows)
+            finally:
+                engine.dispose()
+        os.remove(processing_path)
+
+    def shutdown(self):
+        self.flush()
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, text
+from src.models.user import db
+
+
+class ServerEvent(db.Model):
+    """Notificações de alteração distribuídas aos clientes via SSE.
+
+    A tabela funciona como broker local: cada worker do gunicorn lê os eventos
+    novos e os repassa às conexões abertas nele.
+    """
+    __tablename__ = 'server_event'
+    # Ids são os identificadores SSE usados para retomar o stream; não podem ser reutilizados
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+EVENT_RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = 3600  # segundos entre limpezas de eventos antigos de cada banco
+
+_pruned_at = {}  # banco -> momento (monotônico) da última limpeza neste processo
+
+
+def publish_event(event_type, **data):
+    """Registrar um evento na sessão atual; ele é publicado quando a rota fizer commit"""
+    db.session.add(ServerEvent(event_type=event_type, payload=json.dumps(data)))
+
+    # Eventos antigos são apagados na mesma transação, no máximo uma vez por hora por banco,
+    # independentemente de haver clientes conectados
+    key = str(db.session.get_bind(ServerEvent.__mapper__).url)
+    now = time.monotonic()
+    if now - _pruned_at.get(key, 0) > PRUNE_INTERVAL:
+        _pruned_at[key] = now
+        db.session.execute(ServerEvent.__table__.delete().where(
+            ServerEvent.__table__.c.created_at < datetime.utcnow() - EVENT_RETENTION
+        ))
+
+
+def format_sse(event_id, event_type, payload):
+    data = json.dumps({'type': event_type, **json.loads(payload)}, separators=(',', ':'))
+    return f'id: {event_id}\ndata: {data}\n\n'
+
+
+class EventBroker:
+    """Distribui os eventos gravados em `server_event` às conexões SSE deste processo.
+
+    Uma única thread por processo e por banco consulta a tabela, independentemente
+    do número de clientes conectados. A thread só existe enquanto houver assinantes:
+    ela termina quando o último sai e é recriada pelo próximo `subscribe`.
+    """
+
+    def __init__(self, engine, poll_interval=1.0, queue_size=1000):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._engine = engine
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def _fetch(self, connection, after_id, limit=500):
+        table = ServerEvent.__table__
+        return connection.execute(
+            select(table.c.id, table.c.event_type, table.c.payload)
+            .where(table.c.id > after_id)
+            .order_by(table.c.id)
+            .limit(limit)
+        ).all()
+
+    def _last_id(self):
+        with self._engine.connect() as connection:
+            return connection.execute(select(func.max(ServerEvent.__table__.c.id))).scalar() or 0
+
+    def _run(self, last_id):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if self._closed or not self._subscribers:
+                    self._thread = None
+                    return
+            database = self._engine.url.database
+            if database and not os.path.exists(database):
+                # Arquivo removido (ex.: tenant move em outro processo): os clientes reconectam
+                # e a requisição nova usa o banco atual da clínica
+                self.close()
+                continue
+            try:
+                with self._engine.connect() as connection:
+                    rows = self._fetch(connection, last_id)
+                if rows:
+                    last_id = rows[-1].id
+                    self._dispatch(rows)
+            except Exception as error:
+                print(f"Erro no broker de eventos: {error}")
+
+    def _dispatch(self, rows):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            for row in rows:
+                try:
+                    subscriber.put_nowait(row)
+                except queue.Full:
+                    # Cliente lento demais: encerra o stream; ele reconecta com Last-Event-ID
+                    self.unsubscribe(subscriber)
+                    self._end_stream(subscriber)
+                    break
+
+    @staticmethod
+    def _end_stream(subscriber):
+        with subscriber.mutex:
+            subscriber.queue.clear()
+        subscriber.put_nowait(None)
+
+    def subscribe(self, last_event_id=None):
+        """Registrar um assinante.
+
+        Retorna (fila, eventos pendentes desde last_event_id, reset). `reset` indica
+        que os eventos desde last_event_id já foram descartados e o cliente deve
+        recarregar tudo.
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Broker encerrado')
+            # Workers do gunicorn são criados por fork; cada processo precisa da sua thread
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._subscribers = set()
+                self._thread = None
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                # A thread parte do último evento existente antes da leitura do backlog abaixo,
+                # então nenhum evento fica entre os dois
+                self._thread = threading.Thread(target=self._run, args=(self._last_id(),),
+                                                name='sse-broker', daemon=True)
+                self._thread.start()
+
+        backlog, reset = [], False
+        if last_event_id is not None:
+            with self._engine.connect() as connection:
+                oldest = connection.execute(select(func.min(ServerEvent.__table__.c.id))).scalar()
+                # Último id já emitido; continua valendo mesmo depois que a limpeza esvazia a tabela
+                last_issued = connection.execute(text(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'server_event'"
+                )).scalar() or 0
+                first_available = oldest if oldest is not None else last_issued + 1
+                if last_event_id < first_available - 1 or last_event_id > last_issued:
+                    # Eventos descartados, ou id que não é deste banco (ex.: outra clínica)
+                    reset = True
+                else:
+                    backlog = self._fetch(connection, last_event_id, limit=self.queue_size)
+                    reset = len(backlog) == self.queue_size
+        return subscriber, backlog, reset
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def close(self):
+        """Encerrar os streams e a thread (o banco deixou de ser usado por este processo)"""
+        with self._lock:
+            self._closed = True
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscriber in subscribers:
+            self._end_stream(subscriber)
+
+
+_brokers = {}  # engine -> broker
+_brokers_lock = threading.Lock()
+
+
+def get_broker(engine):
+    """Broker do banco informado (cada clínica tem o seu próprio arquivo e eventos)"""
+    with _brokers_lock:
+        broker = _brokers.get(engine)
+        if broker is None or broker._closed:
+            broker = _brokers[engine] = EventBroker(engine)
+        return broker
+
+
+def discard_broker(engine):
+    """Encerrar o broker de uma engine descartada (ex.: removida do cache de clínicas)"""
+    with _brokers_lock:
+        broker = _brokers.pop(engine, None)
+    if broker is not None:
+        broker.close()
@@ -1,6 +1,107 @@
+import re
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from src.models.user import db
+from sqlalchemy import inspect, text
+from src.models.user import db, schema_lock
+
+def normalize_phone(phone):
+    """Manter apenas os dígitos do telefone, para comparação e busca"""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits or None
+
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    return email or None
+
+def contact_key(name=None, phone=None, email=None):
+    """Nome (minúsculo), telefone e email normalizados, usados para comparar proprietários"""
+    name = (name or '').strip().lower() or None
+    return (name, normalize_phone(phone), normalize_email(email))
+
+def contacts_conflict(existing, new):
+    """Dados que impedem tratar os dois como o mesmo proprietário: preenchidos nos dois e diferentes"""
+    return any(a and b and a != b for a, b in zip(existing, new))
+
+class Owner(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100))
+    phone = db.Column(db.String(20))
+    email = db.Column(db.String(120))
+    # Formas normalizadas usadas nas buscas
+    phone_normalized = db.Column(db.String(20), index=True)
+    email_normalized = db.Column(db.String(120), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, index=True)  # sequência de sincronização
+
+    pets = db.relationship('Pet', back_populates='owner', lazy=True)
+
+    def __repr__(self):
+        return f'<Owner {self.name}>'
+
+    def set_contact(self, name=None, phone=None, email=None):
+        if name is not None:
+            self.name = name
+        if phone is not None:
+            self.phone = phone
+            self.phone_normalized = normalize_phone(phone)
+        if email is not None:
+            self.email = email
+            self.email_normalized = normalize_email(email)
+
+    @classmethod
+    def contact_taken(cls, phone=None, email=None, exclude_id=None):
+        """Verificar se o telefone ou o email (normalizados) já pertencem a outro proprietário"""
+        for column, value in ((cls.phone_normalized, normalize_phone(phone)),
+                              (cls.email_normalized, normalize_email(email))):
+            if value and cls.query.filter(column == value, cls.id != exclude_id).first():
+                return True
+        return False
+
+    def contact_key(self):
+        return ((self.name or '').strip().lower() or None, self.phone_normalized, self.email_normalized)
+
+    @classmethod
+    def find_or_create(cls, name=None, phone=None, email=None):
+        """Reaproveitar o proprietário com mesmo telefone/email, sem alterar o cadastro encontrado.
+
+        Retorna (owner, conflito). Quando o cadastro encontrado diverge no nome ou no outro
+        contato (ou telefone e email pertencem a proprietários diferentes), nada é criado e
+        `conflito` é esse cadastro: o cliente deve escolhê-lo explicitamente por owner_id.
+        """
+        key = contact_key(name, phone, email)
+        if not any(key):
+            return None, None
+        _, phone_normalized, email_normalized = key
+
+        matches = []
+        if phone_normalized:
+            matches += cls.query.filter_by(phone_normalized=phone_normalized).all()
+        if email_normalized:
+            matches += [o for o in cls.query.filter_by(email_normalized=email_normalized).all() if o not in matches]
+        for owner in matches:
+            if contacts_conflict(owner.contact_key(), key):
+                return None, owner
+        if len(matches) > 1:
+            return None, matches[0]
+        if matches:
+            return matches[0], None
+
+        owner = cls()
+        owner.set_contact(name, phone, email)
+        db.session.add(owner)
+        return owner, None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'phone': self.phone,
+            'email': self.email,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq
+        }
 
 class Pet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,12 +111,14 @@ class Pet(db.Model):
     birth_date = db.Column(db.Date)
     gender = db.Column(db.String(1))  # 'M' ou 'F'
     weight = db.Column(db.Float)
-    owner_name = db.Column(db.String(100))
-    owner_phone = db.Column(db.String(20))
-    owner_email = db.Column(db.String(120))
+    owner_id = db.Column(db.Integer, db.ForeignKey('owner.id'), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, index=True)  # sequência de sincronização
     active = db.Column(db.Boolean, default=True)
     
+    owner = db.relationship('Owner', back_populates='pets', lazy='joined')
+    
     # Relacionamento com vacinações
     vaccinations = db.relationship('Vaccination', backref='pet', lazy=True, cascade='all, delete-orphan')
     parasitic_controls = db.relationship('ParasiticControl', backref='pet', lazy=True, cascade='all, delete-orphan')
@@ -32,26 +135,31 @@ class Pet(db.Model):
             'birth_date': self.birth_date.isoformat() if self.birth_date else None,
             'gender': self.gender,
             'weight': self.weight,
-            'owner_name': self.owner_name,
-            'owner_phone': self.owner_phone,
-            'owner_email': self.owner_email,
+            'owner_id': self.owner_id,
+            'owner_name': self.owner.name if self.owner else None,
+            'owner_phone': self.owner.phone if self.owner else None,
+            'owner_email': self.owner.email if self.owner else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq,
             'active': self.active
         }
 
 class Vaccination(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    pet_id = db.Column(db.Integer, db.ForeignKey('pet.id'), nullable=False)
+    pet_id = db.Column(db.Integer, db.ForeignKey('pet.id'), nullable=False, index=True)
     vaccine_name = db.Column(db.String(100), nullable=False)
     vaccine_type = db.Column(db.String(50))  # V8, V10, V4, V5, FELV, etc.
     dose_number = db.Column(db.Integer)  # 1ª, 2ª, 3ª dose
-    application_date = db.Column(db.Date, nullable=False)
+    application_date = db.Column(db.Date, nullable=False, index=True)
     next_dose_date = db.Column(db.Date)
     veterinarian = db.Column(db.String(100))
     batch_number = db.Column(db.String(50))
     weight_at_vaccination = db.Column(db.Float)
     observations = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, index=True)  # sequência de sincronização
 
     def __repr__(self):
         return f'<Vaccination {self.vaccine_name} - {self.pet.name}>'
@@ -69,7 +177,9 @@ class Vaccination(db.Model):
             'batch_number': self.batch_number,
             'weight_at_vaccination': self.weight_at_vaccination,
             'observations': self.observations,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq
         }
 
 class ParasiticControl(db.Model):
@@ -84,6 +194,8 @@ class ParasiticControl(db.Model):
     veterinarian = db.Column(db.String(100))
     observations = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, index=True)  # sequência de sincronização
 
     def __repr__(self):
         return f'<ParasiticControl {self.product_name} - {self.pet.name}>'
@@ -100,5 +212,76 @@ class ParasiticControl(db.Model):
             'weight_at_application': self.weight_at_application,
             'veterinarian': self.veterinarian,
             'observations': self.observations,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq
         }
+
+def ensure_owner_schema(engine=None):
+    """Migrar bancos criados antes do cadastro de proprietários.
+
+    Adiciona pet.owner_id e transforma os campos owner_name/owner_phone/owner_email
+    antigos em registros de Owner. Pets com o mesmo telefone ou email normalizados são
+    unificados apenas quando nenhum outro dado (nome, telefone, email) diverge; pets sem
+    contato têm cada um o seu proprietário, já que o nome sozinho não identifica ninguém.
+    """
+    engine = engine or db.engine
+    with schema_lock(engine) as connection:
+        columns = {c['name'] for c in inspect(connection).get_columns('pet')}
+        if 'owner_id' not in columns:
+            connection.execute(text('ALTER TABLE pet ADD COLUMN owner_id INTEGER REFERENCES owner (id)'))
+        for index in Pet.__table__.indexes:
+            if 'owner_id' in index.columns:
+                index.create(connection, checkfirst=True)
+
+        if not {'owner_name', 'owner_phone', 'owner_email'} <= columns:
+            return
+        rows = connection.execute(text(
+            'SELECT id, owner_name, owner_phone, owner_email FROM pet WHERE owner_id IS NULL ORDER BY id'
+        )).all()
+
+        owners = {}  # id -> contact_key do proprietário criado
+        by_contact = {}  # ('phone'|'email', valor normalizado) -> ids dos proprietários com esse contato
+        for pet_id, name, phone, email in rows:
+            name = (name or '').strip() or None
+            key = contact_key(name, phone, email)
+            _, phone_normalized, email_normalized = key
+            if not any(key):
+                continue
+            keys = [k for k in (('phone', phone_normalized), ('email', email_normalized)) if k[1]]
+
+            owner_id = next((
+                candidate for k in keys for candidate in by_contact.get(k, [])
+                if not contacts_conflict(owners[candidate], key)
+            ), None)
+            if owner_id is None:
+                owner_id = connection.execute(text(
+                    'INSERT INTO owner (name, phone, email, phone_normalized, email_normalized, created_at, updated_at) '
+                    'VALUES (:name, :phone, :email, :phone_normalized, :email_normalized, :now, :now)'
+                ), {
+                    'name': name,
+                    'phone': phone if phone_normalized else None,
+                    'email': email if email_normalized else None,
+                    'phone_normalized': phone_normalized, 'email_normalized': email_normalized,
+                    'now': datetime.utcnow()
+                }).lastrowid
+                owners[owner_id] = key
+            else:
+                # Completar apenas o que faltava; valores existentes nunca são substituídos
+                owner = owners[owner_id]
+                connection.execute(text(
+                    'UPDATE owner SET '
+                    'phone = COALESCE(phone, :phone), phone_normalized = COALESCE(phone_normalized, :phone_normalized), '
+                    'email = COALESCE(email, :email), email_normalized = COALESCE(email_normalized, :email_normalized), '
+                    'name = COALESCE(name, :name) WHERE id = :id'
+                ), {
+                    'id': owner_id, 'name': name,
+                    'phone': phone if phone_normalized else None, 'phone_normalized': phone_normalized,
+                    'email': email if email_normalized else None, 'email_normalized': email_normalized
+                })
+                owners[owner_id] = tuple(a or b for a, b in zip(owner, key))
+            _, owner_phone, owner_email = owners[owner_id]
+            for k in (('phone', owner_phone), ('email', owner_email)):
+                if k[1] and owner_id not in by_contact.setdefault(k, []):
+                    by_contact[k].append(owner_id)
+            connection.execute(text('UPDATE pet SET owner_id = :owner_id WHERE id = :id'), {'owner_id': owner_id, 'id': pet_id})
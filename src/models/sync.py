@@ -0,0 +1,153 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from src.models.user import db, schema_lock, User
+from src.models.pet import Owner, Pet, Vaccination, ParasiticControl
+
+# Entidades com controle de alterações para sincronização incremental
+SYNC_ENTITIES = {
+    'owners': Owner,
+    'pets': Pet,
+    'vaccinations': Vaccination,
+    'parasitic_controls': ParasiticControl,
+    'users': User
+}
+SYNC_ENTITY_NAMES = {model: name for name, model in SYNC_ENTITIES.items()}
+# Colunas cuja alteração isolada não gera nova versão para os clientes
+SYNC_IGNORED_COLUMNS = {'updated_at', 'change_seq', 'last_login'}
+
+
+class SyncCounter(db.Model):
+    """Contador monotônico compartilhado por todas as entidades sincronizadas"""
+    __tablename__ = 'sync_counter'
+
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SyncTombstone(db.Model):
+    """Registro de exclusões físicas para que os clientes removam suas cópias"""
+    __tablename__ = 'sync_tombstone'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'type': self.entity,
+            'id': self.entity_id,
+            'change_seq': self.change_seq
+        }
+
+
+def _allocate_seqs(connection, count):
+    """Reservar `count` números de sequência; o UPDATE obtém o lock de escrita do SQLite"""
+    connection.execute(text('UPDATE sync_counter SET value = value + :n WHERE id = 1'), {'n': count})
+    last = connection.execute(text('SELECT value FROM sync_counter WHERE id = 1')).scalar()
+    return iter(range(last - count + 1, last + 1))
+
+
+def _has_sync_changes(obj):
+    state = inspect(obj)
+    return any(
+        state.attrs[attr.key].history.has_changes()
+        for attr in state.mapper.column_attrs if attr.key not in SYNC_IGNORED_COLUMNS
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _assign_change_seqs(session, flush_context, instances):
+    changed = [obj for obj in session.new if type(obj) in SYNC_ENTITY_NAMES]
+    changed += [
+        obj for obj in session.dirty
+        if type(obj) in SYNC_ENTITY_NAMES and _has_sync_changes(obj)
+    ]
+    deleted = [obj for obj in session.deleted if type(obj) in SYNC_ENTITY_NAMES]
+    if not changed and not deleted:
+        return
+
+    now = datetime.utcnow()
+    seqs = _allocate_seqs(session.connection(), len(changed) + len(deleted))
+    for obj in changed:
+        # O default de created_at só seria aplicado no INSERT, depois deste updated_at
+        if obj.created_at is None:
+            obj.created_at = now
+        obj.updated_at = now
+        obj.change_seq = next(seqs)
+    for obj in deleted:
+        session.add(SyncTombstone(
+            entity=SYNC_ENTITY_NAMES[type(obj)],
+            entity_id=obj.id,
+            change_seq=next(seqs),
+            deleted_at=now
+        ))
+
+
+def ensure_sync_schema(engine=None):
+    """Adicionar colunas de sincronização a bancos criados antes delas e numerar linhas antigas"""
+    engine = engine or db.engine
+    with schema_lock(engine) as connection:
+        connection.execute(text('INSERT OR IGNORE INTO sync_counter (id, value) VALUES (1, 0)'))
+
+        inspector = inspect(connection)
+        for model in SYNC_ENTITIES.values():
+            table = model.__tablename__
+            columns = {c['name'] for c in inspector.get_columns(table)}
+            if 'updated_at' not in columns:
+                connection.execute(text(f'ALTER TABLE "{table}" ADD COLUMN updated_at DATETIME'))
+                connection.execute(text(f'UPDATE "{table}" SET updated_at = created_at'))
+            if 'change_seq' not in columns:
+                connection.execute(text(f'ALTER TABLE "{table}" ADD COLUMN change_seq INTEGER'))
+
+            pending = connection.execute(
+                text(f'SELECT COUNT(*), MAX(id) FROM "{table}" WHERE change_seq IS NULL')
+            ).first()
+            if pending[0]:
+                base = connection.execute(text('SELECT value FROM sync_counter WHERE id = 1')).scalar()
+                connection.execute(
+                    text(f'UPDATE "{table}" SET change_seq = :base + id WHERE change_seq IS NULL'),
+                    {'base': base}
+                )
+                connection.execute(
+                    text('UPDATE sync_counter SET value = :value WHERE id = 1'),
+                    {'value': base + pending[1]}
+                )
+
+            for index in model.__table__.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def get_changes(since, limit, entities):
+    """Retornar até `limit` alterações com sequência maior que `since`, em ordem.
+
+    Retorna (registros por entidade, tombstones, próximo cursor, has_more).
+    """
+    candidates = []
+    for name in entities:
+        model = SYNC_ENTITIES[name]
+        rows = model.query.filter(model.change_seq > since).order_by(model.change_seq).limit(limit + 1).all()
+        candidates.extend((row.change_seq, name, row) for row in rows)
+
+    tombstones = SyncTombstone.query.filter(
+        SyncTombstone.change_seq > since,
+        SyncTombstone.entity.in_(entities)
+    ).order_by(SyncTombstone.change_seq).limit(limit + 1).all()
+    candidates.extend((t.change_seq, None, t) for t in tombstones)
+
+    candidates.sort(key=lambda c: c[0])
+    has_more = len(candidates) > limit
+    batch = candidates[:limit]
+
+    records = {name: [] for name in entities}
+    deleted = []
+    for _, name, row in batch:
+        if name is None:
+            deleted.append(row.to_dict())
+        else:
+            records[name].append(row.to_dict())
+
+    next_seq = batch[-1][0] if batch else since
+    return records, deleted, next_seq, has_more
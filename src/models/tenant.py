@@ -0,0 +1,242 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import g, jsonify, request, session
+from sqlalchemy import create_engine
+from src.models.user import db, schema_lock
+from src.models.events import discard_broker
+from src.models.audit import audit_writer
+from src.models.pet import ensure_owner_schema
+from src.models.sync import ensure_sync_schema
+from src.models.analytics import ensure_analytics_indexes
+
+DEFAULT_TENANT = 'default'
+TENANT_SLUG_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,49}$')
+# Espera, em `tenant move`, pelas requisições que já passaram da checagem de manutenção
+MOVE_DRAIN_SECONDS = 5
+
+
+class Tenant(db.Model):
+    """Clínica hospedada na instalação; cada uma tem seu próprio arquivo SQLite"""
+    __bind_key__ = 'tenants'
+
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    database_path = db.Column(db.String(255), nullable=False)
+    active = db.Column(db.Boolean, default=True)  # False durante manutenção (ex.: mudança de arquivo)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Tenant {self.slug}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'slug': self.slug,
+            'name': self.name,
+            'database_path': self.database_path,
+            'active': self.active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class TenantEngineCache:
+    """Engines por arquivo de banco, limitadas às `max_size` usadas mais recentemente"""
+
+    def __init__(self, max_size=16, engine_options=None):
+        self.max_size = max_size
+        self.engine_options = engine_options or {}
+        self._engines = OrderedDict()
+        self._paths = {}  # clínica -> arquivo de banco usado por ela neste processo
+        self._lock = threading.Lock()
+
+    def get(self, database_path):
+        with self._lock:
+            engine = self._engines.get(database_path)
+            if engine is not None:
+                self._engines.move_to_end(database_path)
+                return engine
+
+            engine = create_engine(f'sqlite:///{database_path}', **self.engine_options)
+            self._engines[database_path] = engine
+            evicted = None
+            if len(self._engines) > self.max_size:
+                _, evicted = self._engines.popitem(last=False)
+        if evicted is not None:
+            self._close(evicted)
+        return engine
+
+    def get_for(self, slug, database_path):
+        """Engine do banco atual da clínica; se ele mudou (tenant move em outro processo),
+        a engine do arquivo antigo é descartada junto com o broker SSE dela"""
+        with self._lock:
+            old_path = self._paths.get(slug)
+            self._paths[slug] = database_path
+        if old_path is not None and old_path != database_path:
+            self.discard(old_path)
+        return self.get(database_path)
+
+    def discard(self, database_path):
+        with self._lock:
+            engine = self._engines.pop(database_path, None)
+        if engine is not None:
+            self._close(engine)
+
+    @staticmethod
+    def _close(engine):
+        # O broker SSE da engine também mantém conexões abertas; seus streams são encerrados
+        # e os clientes reconectam, reabrindo o banco pelo cache
+        discard_broker(engine)
+        engine.dispose()
+
+
+engine_cache = TenantEngineCache()
+
+
+def init_tenancy(app):
+    """Configurar o cache de engines e a resolução da clínica a cada requisição"""
+    engine_cache.max_size = app.config.get('TENANT_ENGINE_CACHE_SIZE', engine_cache.max_size)
+    engine_cache.engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    os.makedirs(app.config['TENANT_DATABASE_DIR'], exist_ok=True)
+    app.before_request(load_request_tenant)
+
+
+def use_tenant(tenant):
+    """Direcionar a sessão do contexto atual ao banco da clínica (None = banco padrão)"""
+    if tenant is None:
+        g.tenant = DEFAULT_TENANT
+        g.tenant_engine = None
+    else:
+        g.tenant = tenant.slug
+        g.tenant_engine = engine_cache.get_for(tenant.slug, tenant.database_path)
+
+
+def find_tenant(slug):
+    if not slug or slug == DEFAULT_TENANT:
+        return None
+    return Tenant.query.filter_by(slug=slug).first()
+
+
+def load_request_tenant():
+    # Arquivos estáticos não acessam o banco
+    if request.blueprint is None:
+        return None
+
+    slug = session.get('tenant')
+    tenant = find_tenant(slug)
+    if slug and slug != DEFAULT_TENANT and tenant is None:
+        session.clear()
+        return jsonify({'error': 'Clínica não encontrada'}), 401
+    if tenant is not None and not tenant.active:
+        return jsonify({'error': 'Clínica em manutenção. Tente novamente em instantes'}), 503
+
+    use_tenant(tenant)
+    return None
+
+
+# FERRAMENTAS ADMINISTRATIVAS
+def migrate_tenant_database(engine):
+    """Criar tabelas ausentes e aplicar as alterações de esquema no banco de uma clínica.
+
+    Cada etapa obtém o lock de escrita do banco, então vários processos podem executá-la
+    ao mesmo tempo (ex.: workers do gunicorn iniciando juntos).
+    """
+    with schema_lock(engine) as connection:
+        db.metadatas[None].create_all(bind=connection)
+    ensure_owner_schema(engine)
+    ensure_sync_schema(engine)
+    ensure_analytics_indexes(engine)
+
+
+def create_tenant(slug, name, database_dir):
+    if not TENANT_SLUG_PATTERN.match(slug) or slug == DEFAULT_TENANT:
+        raise ValueError(f'Identificador de clínica inválido: {slug}')
+    if Tenant.query.filter_by(slug=slug).first():
+        raise ValueError(f'Clínica já existe: {slug}')
+
+    database_path = os.path.join(database_dir, f'{slug}.db')
+    migrate_tenant_database(engine_cache.get(database_path))
+
+    tenant = Tenant(slug=slug, name=name, database_path=database_path, active=True)
+    db.session.add(tenant)
+    db.session.commit()
+    return tenant
+
+
+def _retire_database(connection):
+    """Fazer toda gravação no banco antigo falhar.
+
+    Conexões que os workers ainda mantêm abertas (ou que aguardam o lock de escrita)
+    continuam apontando para o arquivo antigo mesmo depois de renomeado ou removido;
+    com os gatilhos, a gravação delas é recusada em vez de se perder com o arquivo.
+    """
+    tables = [name for (name,) in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    for table in tables:
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            connection.execute(
+                f'CREATE TRIGGER "moved_{table}_{operation.lower()}" BEFORE {operation} ON "{table}" '
+                "BEGIN SELECT RAISE(ABORT, 'Banco da clínica foi movido'); END"
+            )
+
+
+def move_tenant(tenant, database_path, drain_seconds=None):
+    """Copiar o banco da clínica para outro arquivo e passar a usá-lo.
+
+    A clínica fica em manutenção (503) durante a operação. Antes da cópia, espera-se que
+    as requisições em andamento terminem e que os workers gravem a auditoria pendente.
+    Uma transação IMMEDIATE em outra conexão bloqueia as gravações durante o backup e
+    até que o banco antigo seja inutilizado (ver _retire_database); os workers percebem
+    a mudança de arquivo na próxima requisição da clínica e os streams SSE do banco
+    antigo são encerrados para que os clientes reconectem.
+    """
+    if os.path.exists(database_path):
+        raise ValueError(f'Arquivo de destino já existe: {database_path}')
+
+    old_path = tenant.database_path
+    tenant.active = False
+    db.session.commit()
+    if drain_seconds is None:
+        drain_seconds = MOVE_DRAIN_SECONDS + audit_writer.flush_interval
+    time.sleep(drain_seconds)
+
+    switched = False
+    try:
+        guard = sqlite3.connect(old_path, timeout=30)
+        source = sqlite3.connect(old_path)
+        target = sqlite3.connect(database_path)
+        try:
+            guard.execute('BEGIN IMMEDIATE')
+            source.backup(target)
+            _retire_database(guard)
+
+            tenant.database_path = database_path
+            tenant.active = True
+            db.session.commit()
+            switched = True
+            guard.commit()
+        finally:
+            target.close()
+            source.close()
+            guard.close()  # sem commit, os gatilhos são descartados
+    except Exception:
+        if not switched:
+            db.session.rollback()
+            tenant.database_path = old_path
+            tenant.active = True
+            db.session.commit()
+            if os.path.exists(database_path):
+                os.remove(database_path)
+        raise
+
+    engine_cache.discard(old_path)
+    for path in (old_path, f'{old_path}-wal', f'{old_path}-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+    return tenant
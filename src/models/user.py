@@ -1,8 +1,72 @@
+import sqlite3
+from contextlib import contextmanager
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
-db = SQLAlchemy()
+class TenantSession(Session):
+    """Sessão que direciona os modelos sem bind_key ao banco da clínica ativa.
+
+    A clínica da requisição é definida em g.tenant_engine (ver src/models/tenant.py);
+    sem ela, é usado o banco padrão (SQLALCHEMY_DATABASE_URI).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and has_app_context():
+            tenant_engine = g.get('tenant_engine')
+            if tenant_engine is not None and engine is self._db.engines.get(None):
+                return tenant_engine
+        return engine
+
+# db.session é um scoped_session do Flask-SQLAlchemy: cada contexto de aplicação (uma
+# requisição, seja em thread do gthread ou greenlet do gevent) recebe sua própria sessão,
+# removida ao fim da requisição. Estado compartilhado entre requisições fica apenas nas
+# engines (pools de conexões) e nos caches protegidos por lock.
+db = SQLAlchemy(session_options={'class_': TenantSession})
+
+BUSY_TIMEOUT = 15000  # milissegundos esperando o lock de escrita
+SCHEMA_LOCK_TIMEOUT = 300000  # milissegundos esperando outro processo terminar a migração
+
+@event.listens_for(Engine, 'connect')
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Ajustar cada conexão SQLite para vários workers/threads no mesmo arquivo.
+
+    WAL permite leituras simultâneas a uma gravação; busy_timeout faz a conexão esperar
+    pelo lock de escrita em vez de falhar imediatamente com "database is locked" (inclusive
+    na troca para WAL, por isso vem antes). O synchronous padrão (FULL) é mantido: cada
+    commit confirmado é gravado em disco, mesmo em caso de queda de energia.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT}')
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
+@contextmanager
+def schema_lock(engine):
+    """Conexão com o lock de escrita do banco obtido antes de qualquer leitura (BEGIN IMMEDIATE).
+
+    Os workers do gunicorn aplicam as alterações de esquema ao iniciar, ao mesmo tempo. Com o
+    lock, um processo de cada vez verifica e altera o esquema; os demais esperam e encontram
+    tudo pronto. As verificações devem ser feitas pela conexão retornada, dentro do bloco.
+    """
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.exec_driver_sql(f'PRAGMA busy_timeout={SCHEMA_LOCK_TIMEOUT}')
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except Exception:
+            connection.exec_driver_sql('ROLLBACK')
+            raise
+        else:
+            connection.exec_driver_sql('COMMIT')
+        finally:
+            connection.exec_driver_sql(f'PRAGMA busy_timeout={BUSY_TIMEOUT}')
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -13,6 +77,8 @@ class User(db.Model):
     active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.Integer, index=True)  # sequência de sincronização
     
     # Permissões específicas para usuários comuns
     can_access_vaccination = db.Column(db.Boolean, default=True)
@@ -40,6 +106,8 @@ class User(db.Model):
             'active': self.active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'last_login': self.last_login.isoformat() if self.last_login else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'change_seq': self.change_seq,
             'permissions': {
                 'can_access_vaccination': self.can_access_vaccination,
                 'can_access_reports': self.can_access_reports,
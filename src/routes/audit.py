@@ -0,0 +1,58 @@
+from flask import Blueprint, jsonify, request
+from src.models.audit import AuditLog, AUDITED_ENTITIES, audit_writer
+from src.routes.user import require_admin
+
+audit_bp = Blueprint('audit', __name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+@audit_bp.route('/admin/audit', methods=['GET'])
+def get_audit_log():
+    admin_error = require_admin()
+    if admin_error:
+        return admin_error
+
+    entity = request.args.get('entity')
+    if entity and entity not in AUDITED_ENTITIES.values():
+        return jsonify({'error': f'Entidade inválida. Use: {", ".join(AUDITED_ENTITIES.values())}'}), 400
+
+    params = {'entity_id': None, 'user_id': None, 'before': None, 'limit': DEFAULT_PAGE_SIZE}
+    for name in params:
+        if name in request.args:
+            try:
+                params[name] = int(request.args[name])
+            except ValueError:
+                return jsonify({'error': f'Parâmetro "{name}" deve ser um número inteiro'}), 400
+    entity_id, user_id, before, limit = params.values()
+
+    if limit < 1:
+        return jsonify({'error': 'Parâmetro "limit" deve ser positivo'}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    if entity_id is not None and not entity:
+        return jsonify({'error': 'Informe "entity" ao filtrar por "entity_id"'}), 400
+
+    # Incluir registros ainda não gravados pelo processo atual
+    audit_writer.flush()
+
+    # Paginação por cursor (id decrescente), atendida pelos índices por entidade e por usuário
+    query = AuditLog.query
+    if entity:
+        query = query.filter(AuditLog.entity == entity)
+    if entity_id is not None:
+        query = query.filter(AuditLog.entity_id == entity_id)
+    if user_id is not None:
+        query = query.filter(AuditLog.user_id == user_id)
+    if before is not None:
+        query = query.filter(AuditLog.id < before)
+
+    entries = query.order_by(AuditLog.id.desc()).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    return jsonify({
+        'entries': [e.to_dict() for e in entries],
+        'has_more': has_more,
+        'next_before': entries[-1].id if has_more else None
+    })
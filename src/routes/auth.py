@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, session
 from datetime import datetime
 from src.models.user import User, db
+from src.models.tenant import DEFAULT_TENANT, find_tenant, use_tenant
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -13,6 +14,13 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username e password são obrigatórios'}), 400
     
+    # Clínica informada no login; sem ela é usado o banco padrão
+    tenant_slug = data.get('tenant') or DEFAULT_TENANT
+    tenant = find_tenant(tenant_slug)
+    if tenant_slug != DEFAULT_TENANT and (tenant is None or not tenant.active):
+        return jsonify({'error': 'Clínica não encontrada ou em manutenção'}), 401
+    use_tenant(tenant)
+    
     user = User.query.filter_by(username=username).first()
     
     if user and user.check_password(password) and user.active:
@@ -21,6 +29,7 @@ def login():
         db.session.commit()
         
         # Criar sessão
+        session['tenant'] = tenant_slug
         session['user_id'] = user.id
         session['username'] = user.username
         session['profile'] = user.profile
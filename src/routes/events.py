@@ -0,0 +1,101 @@
+import queue
+import threading
+from flask import Blueprint, Response, current_app, jsonify, request, session
+from src.models.user import User, db
+from src.models.events import get_broker, format_sse
+
+events_bp = Blueprint('events', __name__)
+
+HEARTBEAT_INTERVAL = 15  # segundos
+RETRY_INTERVAL = 5000  # milissegundos até o navegador reconectar
+POLLING_INTERVAL = 30  # segundos entre atualizações do cliente sem stream
+
+# Cada stream ocupa uma thread (ou greenlet) do processo enquanto está aberto
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+def acquire_stream_slot():
+    """Reservar uma vaga de stream neste processo, respeitando SSE_MAX_STREAMS"""
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= current_app.config['SSE_MAX_STREAMS']:
+            return False
+        _open_streams += 1
+        return True
+
+def release_stream_slot():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+def parse_last_event_id():
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+@events_bp.route('/events', methods=['GET'])
+def stream_events():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Usuário não autenticado'}), 401
+
+    user = User.query.get(session['user_id'])
+    if not user or not user.active:
+        return jsonify({'error': 'Usuário inativo'}), 401
+
+    # Sem vagas (ou workers sync, onde SSE_MAX_STREAMS é 0) o cliente passa a consultar periodicamente
+    if not acquire_stream_slot():
+        response = jsonify({
+            'error': 'Notificações em tempo real indisponíveis no momento',
+            'polling_interval': POLLING_INTERVAL
+        })
+        response.headers['Retry-After'] = str(POLLING_INTERVAL)
+        return response, 503
+
+    # O banco (e portanto o broker) é o da clínica da sessão
+    try:
+        broker = get_broker(db.session.get_bind())
+        subscriber, backlog, reset = broker.subscribe(parse_last_event_id())
+    except Exception:
+        release_stream_slot()
+        raise
+
+    def generate():
+        last_sent = 0
+        try:
+            yield f'retry: {RETRY_INTERVAL}\n\n'
+            if reset:
+                yield 'event: reset\ndata: {}\n\n'
+            for row in backlog:
+                last_sent = row.id
+                yield format_sse(row.id, row.event_type, row.payload)
+
+            while True:
+                try:
+                    row = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+                if row is None:
+                    return
+                # Eventos já enviados no backlog também podem chegar pela fila
+                if row.id <= last_sent:
+                    continue
+                last_sent = row.id
+                yield format_sse(row.id, row.event_type, row.payload)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+    # Chamado pelo servidor ao fim da resposta, mesmo que o stream nem tenha começado
+    @response.call_on_close
+    def close_stream():
+        broker.unsubscribe(subscriber)
+        release_stream_slot()
+
+    return response
@@ -0,0 +1,87 @@
+from flask import Blueprint, jsonify, request
+from src.models.user import db
+from src.models.pet import Owner, Pet, normalize_phone, normalize_email
+from src.routes.pet import check_pet_permission
+
+owner_bp = Blueprint('owner', __name__)
+
+@owner_bp.route('/owners', methods=['GET'])
+def get_owners():
+    permission_error = check_pet_permission()
+    if permission_error:
+        return permission_error
+    
+    # Filtros por telefone/email usam as colunas normalizadas indexadas
+    query = Owner.query
+    if 'phone' in request.args:
+        phone_normalized = normalize_phone(request.args['phone'])
+        if not phone_normalized:
+            return jsonify({'error': 'Parâmetro "phone" deve conter dígitos'}), 400
+        query = query.filter(Owner.phone_normalized == phone_normalized)
+    if 'email' in request.args:
+        email_normalized = normalize_email(request.args['email'])
+        if not email_normalized:
+            return jsonify({'error': 'Parâmetro "email" não pode ser vazio'}), 400
+        query = query.filter(Owner.email_normalized == email_normalized)
+    
+    owners = query.order_by(Owner.name).all()
+    return jsonify([owner.to_dict() for owner in owners])
+
+@owner_bp.route('/owners', methods=['POST'])
+def create_owner():
+    permission_error = check_pet_permission()
+    if permission_error:
+        return permission_error
+    
+    data = request.json
+    
+    # Validações
+    if not data.get('name'):
+        return jsonify({'error': 'Nome do proprietário é obrigatório'}), 400
+    
+    if Owner.contact_taken(data.get('phone'), data.get('email')):
+        return jsonify({'error': 'Já existe proprietário com este telefone ou email'}), 400
+    
+    owner = Owner()
+    owner.set_contact(data['name'], data.get('phone'), data.get('email'))
+    
+    db.session.add(owner)
+    db.session.commit()
+    return jsonify(owner.to_dict()), 201
+
+@owner_bp.route('/owners/<int:owner_id>', methods=['GET'])
+def get_owner(owner_id):
+    permission_error = check_pet_permission()
+    if permission_error:
+        return permission_error
+    
+    owner = Owner.query.get_or_404(owner_id)
+    return jsonify(owner.to_dict())
+
+@owner_bp.route('/owners/<int:owner_id>', methods=['PUT'])
+def update_owner(owner_id):
+    permission_error = check_pet_permission()
+    if permission_error:
+        return permission_error
+    
+    owner = Owner.query.get_or_404(owner_id)
+    data = request.json
+    
+    # Verificar se telefone/email já pertencem a outro proprietário
+    if Owner.contact_taken(data.get('phone'), data.get('email'), exclude_id=owner.id):
+        return jsonify({'error': 'Já existe proprietário com este telefone ou email'}), 400
+    
+    owner.set_contact(data.get('name'), data.get('phone'), data.get('email'))
+    
+    db.session.commit()
+    return jsonify(owner.to_dict())
+
+@owner_bp.route('/owners/<int:owner_id>/pets', methods=['GET'])
+def get_owner_pets(owner_id):
+    permission_error = check_pet_permission()
+    if permission_error:
+        return permission_error
+    
+    owner = Owner.query.get_or_404(owner_id)
+    pets = Pet.query.filter_by(owner_id=owner.id, active=True).all()
+    return jsonify([pet.to_dict() for pet in pets])
@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, request, session
-from datetime import datetime, date
+from sqlalchemy.orm import contains_eager
+from datetime import datetime, date, timedelta
 from src.models.user import User, db
-from src.models.pet import Pet, Vaccination, ParasiticControl
+from src.models.pet import Owner, Pet, Vaccination, ParasiticControl
+from src.models.events import publish_event
 
 pet_bp = Blueprint('pet', __name__)
 
@@ -38,6 +40,34 @@ def check_vaccination_permission():
     
     return None
 
+SCHEDULE_WINDOW_DAYS = 30
+
+def affects_schedule(*dates):
+    """Verificar se alguma das datas cai na janela do cronograma de vacinações"""
+    today = date.today()
+    next_month = today + timedelta(days=SCHEDULE_WINDOW_DAYS)
+    return any(d and today <= d <= next_month for d in dates)
+
+def resolve_owner(data):
+    """Obter o proprietário pelo owner_id ou pelos campos owner_* (reaproveitando o cadastro existente).
+
+    Retorna (owner, erro). Se os campos owner_* coincidem só em parte com um cadastro
+    existente, responde 409 com o owner_id desse cadastro para o cliente confirmar.
+    """
+    if data.get('owner_id'):
+        owner = Owner.query.get(data['owner_id'])
+        if not owner:
+            return None, (jsonify({'error': 'Proprietário não encontrado'}), 404)
+        return owner, None
+    owner, conflict = Owner.find_or_create(data.get('owner_name'), data.get('owner_phone'), data.get('owner_email'))
+    if conflict:
+        return None, (jsonify({
+            'error': 'Telefone ou email pertence a outro proprietário com dados diferentes; '
+                     'informe owner_id para usar esse cadastro',
+            'owner_id': conflict.id
+        }), 409)
+    return owner, None
+
 # ROTAS PARA PETS
 @pet_bp.route('/pets', methods=['GET'])
 def get_pets():
@@ -71,6 +101,10 @@ def create_pet():
         except ValueError:
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
     
+    owner, owner_error = resolve_owner(data)
+    if owner_error:
+        return owner_error
+    
     pet = Pet(
         name=data['name'],
         species=data['species'],
@@ -78,12 +112,12 @@ def create_pet():
         birth_date=birth_date,
         gender=data.get('gender'),
         weight=data.get('weight'),
-        owner_name=data.get('owner_name'),
-        owner_phone=data.get('owner_phone'),
-        owner_email=data.get('owner_email')
+        owner=owner
     )
     
     db.session.add(pet)
+    db.session.flush()
+    publish_event('pet.created', pet_id=pet.id)
     db.session.commit()
     return jsonify(pet.to_dict()), 201
 
@@ -124,10 +158,31 @@ def update_pet(pet_id):
     pet.breed = data.get('breed', pet.breed)
     pet.gender = data.get('gender', pet.gender)
     pet.weight = data.get('weight', pet.weight)
-    pet.owner_name = data.get('owner_name', pet.owner_name)
-    pet.owner_phone = data.get('owner_phone', pet.owner_phone)
-    pet.owner_email = data.get('owner_email', pet.owner_email)
     
+    # owner_id troca o proprietário; os campos owner_* editam o proprietário atual do pet
+    # (valendo para todos os pets dele) ou, se o pet ainda não tem um, buscam/criam um cadastro
+    if data.get('owner_id'):
+        owner, owner_error = resolve_owner(data)
+        if owner_error:
+            return owner_error
+        pet.owner = owner
+    elif any(key in data for key in ('owner_name', 'owner_phone', 'owner_email')):
+        if pet.owner is None:
+            owner, owner_error = resolve_owner(data)
+            if owner_error:
+                return owner_error
+            pet.owner = owner
+        elif not any((data.get(key) or '').strip() for key in ('owner_name', 'owner_phone', 'owner_email')):
+            pet.owner = None  # campos apagados: desvincular sem apagar o cadastro compartilhado
+        else:
+            # Mesma regra de PUT /owners/<id>: telefone/email não podem pertencer a outro proprietário
+            if Owner.contact_taken(data.get('owner_phone'), data.get('owner_email'), exclude_id=pet.owner.id):
+                return jsonify({'error': 'Já existe proprietário com este telefone ou email'}), 400
+            pet.owner.set_contact(data.get('owner_name'), data.get('owner_phone'), data.get('owner_email'))
+    
+    publish_event('pet.updated', pet_id=pet.id)
+    if affects_schedule(*[v.next_dose_date for v in pet.vaccinations]):
+        publish_event('schedule.changed', pet_id=pet.id)
     db.session.commit()
     return jsonify(pet.to_dict())
 
@@ -139,6 +194,9 @@ def delete_pet(pet_id):
     
     pet = Pet.query.get_or_404(pet_id)
     pet.active = False  # Soft delete
+    publish_event('pet.deactivated', pet_id=pet.id)
+    if affects_schedule(*[v.next_dose_date for v in pet.vaccinations]):
+        publish_event('schedule.changed', pet_id=pet.id)
     db.session.commit()
     return '', 204
 
@@ -192,6 +250,10 @@ def create_vaccination(pet_id):
     )
     
     db.session.add(vaccination)
+    db.session.flush()
+    publish_event('vaccination.created', pet_id=pet_id, vaccination_id=vaccination.id)
+    if affects_schedule(next_dose_date):
+        publish_event('schedule.changed', pet_id=pet_id)
     db.session.commit()
     return jsonify(vaccination.to_dict()), 201
 
@@ -203,6 +265,7 @@ def update_vaccination(vaccination_id):
     
     vaccination = Vaccination.query.get_or_404(vaccination_id)
     data = request.json
+    previous_next_dose_date = vaccination.next_dose_date
     
     # Converter datas se fornecidas
     if data.get('application_date'):
@@ -226,6 +289,9 @@ def update_vaccination(vaccination_id):
     vaccination.weight_at_vaccination = data.get('weight_at_vaccination', vaccination.weight_at_vaccination)
     vaccination.observations = data.get('observations', vaccination.observations)
     
+    publish_event('vaccination.updated', pet_id=vaccination.pet_id, vaccination_id=vaccination.id)
+    if affects_schedule(previous_next_dose_date, vaccination.next_dose_date):
+        publish_event('schedule.changed', pet_id=vaccination.pet_id)
     db.session.commit()
     return jsonify(vaccination.to_dict())
 
@@ -236,6 +302,9 @@ def delete_vaccination(vaccination_id):
         return permission_error
     
     vaccination = Vaccination.query.get_or_404(vaccination_id)
+    publish_event('vaccination.deleted', pet_id=vaccination.pet_id, vaccination_id=vaccination.id)
+    if affects_schedule(vaccination.next_dose_date):
+        publish_event('schedule.changed', pet_id=vaccination.pet_id)
     db.session.delete(vaccination)
     db.session.commit()
     return '', 204
@@ -289,6 +358,8 @@ def create_parasitic_control(pet_id):
     )
     
     db.session.add(control)
+    db.session.flush()
+    publish_event('parasitic_control.created', pet_id=pet_id, control_id=control.id)
     db.session.commit()
     return jsonify(control.to_dict()), 201
 
@@ -322,6 +393,7 @@ def update_parasitic_control(control_id):
     control.veterinarian = data.get('veterinarian', control.veterinarian)
     control.observations = data.get('observations', control.observations)
     
+    publish_event('parasitic_control.updated', pet_id=control.pet_id, control_id=control.id)
     db.session.commit()
     return jsonify(control.to_dict())
 
@@ -332,6 +404,7 @@ def delete_parasitic_control(control_id):
         return permission_error
     
     control = ParasiticControl.query.get_or_404(control_id)
+    publish_event('parasitic_control.deleted', pet_id=control.pet_id, control_id=control.id)
     db.session.delete(control)
     db.session.commit()
     return '', 204
@@ -348,13 +421,12 @@ def get_vaccination_schedule():
         return jsonify({'error': 'Acesso negado. Usuário não tem permissão para acessar relatórios'}), 403
     
     # Buscar próximas vacinações (próximos 30 dias)
-    from datetime import timedelta
     today = date.today()
-    next_month = today + timedelta(days=30)
+    next_month = today + timedelta(days=SCHEDULE_WINDOW_DAYS)
     
     upcoming_vaccinations = Vaccination.query.filter(
         Vaccination.next_dose_date.between(today, next_month)
-    ).join(Pet).filter(Pet.active == True).all()
+    ).join(Pet).filter(Pet.active == True).options(contains_eager(Vaccination.pet).joinedload(Pet.owner)).all()
     
     result = []
     for vaccination in upcoming_vaccinations:
@@ -363,8 +435,9 @@ def get_vaccination_schedule():
             'pet_id': vaccination.pet_id,
             'vaccine_name': vaccination.vaccine_name,
             'next_dose_date': vaccination.next_dose_date.isoformat(),
-            'owner_name': vaccination.pet.owner_name,
-            'owner_phone': vaccination.pet.owner_phone
+            'owner_id': vaccination.pet.owner_id,
+            'owner_name': vaccination.pet.owner.name if vaccination.pet.owner else None,
+            'owner_phone': vaccination.pet.owner.phone if vaccination.pet.owner else None
         })
     
     return jsonify(result)
@@ -0,0 +1,79 @@
+from flask import Blueprint, jsonify, request, session
+from datetime import datetime, date, timedelta
+from src.models.user import User
+from src.models.analytics import (
+    VaccinationDailyRollup, VaccinationMonthlyRollup, VaccineCoverageRollup,
+    VeterinarianOverdueRollup, get_analytics_state
+)
+
+report_bp = Blueprint('report', __name__)
+
+def check_reports_permission():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Usuário não autenticado'}), 401
+
+    user = User.query.get(session['user_id'])
+    if not user or not user.active:
+        return jsonify({'error': 'Usuário inativo'}), 401
+
+    if not user.is_admin() and not user.can_access_reports:
+        return jsonify({'error': 'Acesso negado. Usuário não tem permissão para acessar relatórios'}), 403
+
+    return None
+
+@report_bp.route('/reports/coverage', methods=['GET'])
+def get_coverage():
+    permission_error = check_reports_permission()
+    if permission_error:
+        return permission_error
+
+    # Apenas leitura dos rollups; a atualização é feita por `flask refresh-analytics` (timer do systemd)
+    state = get_analytics_state()
+    coverage = VaccineCoverageRollup.query.order_by(
+        VaccineCoverageRollup.species, VaccineCoverageRollup.vaccine_type
+    ).all()
+    veterinarians = VeterinarianOverdueRollup.query.order_by(VeterinarianOverdueRollup.veterinarian).all()
+
+    return jsonify({
+        'as_of': state.as_of.isoformat() if state and state.as_of else None,
+        'refreshed_at': state.refreshed_at.isoformat() if state and state.refreshed_at else None,
+        'coverage': [c.to_dict() for c in coverage],
+        'overdue_by_veterinarian': [v.to_dict() for v in veterinarians]
+    })
+
+@report_bp.route('/reports/activity', methods=['GET'])
+def get_activity():
+    permission_error = check_reports_permission()
+    if permission_error:
+        return permission_error
+
+    period = request.args.get('period', 'monthly')
+    if period not in ['daily', 'monthly']:
+        return jsonify({'error': 'Período deve ser "daily" ou "monthly"'}), 400
+
+    # Intervalo padrão: últimos 30 dias (diário) ou últimos 12 meses (mensal)
+    today = date.today()
+    default_start = today - timedelta(days=30) if period == 'daily' else date(today.year - 1, today.month, 1)
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else default_start
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else today
+    except ValueError:
+        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+
+    state = get_analytics_state()
+    if period == 'daily':
+        rows = VaccinationDailyRollup.query.filter(
+            VaccinationDailyRollup.day.between(start, end)
+        ).order_by(VaccinationDailyRollup.day, VaccinationDailyRollup.vaccine_type).all()
+    else:
+        rows = VaccinationMonthlyRollup.query.filter(
+            VaccinationMonthlyRollup.month.between(start.strftime('%Y-%m'), end.strftime('%Y-%m'))
+        ).order_by(VaccinationMonthlyRollup.month, VaccinationMonthlyRollup.vaccine_type).all()
+
+    return jsonify({
+        'period': period,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'refreshed_at': state.refreshed_at.isoformat() if state and state.refreshed_at else None,
+        'activity': [r.to_dict() for r in rows]
+    })
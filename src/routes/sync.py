@@ -0,0 +1,52 @@
+from flask import Blueprint, jsonify, request, session
+from src.models.user import User
+from src.models.sync import get_changes
+
+sync_bp = Blueprint('sync', __name__)
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 2000
+
+def allowed_entities(user):
+    """Entidades que o usuário pode sincronizar, conforme suas permissões"""
+    entities = []
+    if user.is_admin() or user.can_manage_pets:
+        entities.extend(['owners', 'pets'])
+    if user.is_admin() or user.can_access_vaccination:
+        entities.extend(['vaccinations', 'parasitic_controls'])
+    if user.is_admin():
+        entities.append('users')
+    return entities
+
+@sync_bp.route('/sync', methods=['GET'])
+def sync():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Usuário não autenticado'}), 401
+
+    user = User.query.get(session['user_id'])
+    if not user or not user.active:
+        return jsonify({'error': 'Usuário inativo'}), 401
+
+    try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', DEFAULT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({'error': 'Parâmetros "since" e "limit" devem ser números inteiros'}), 400
+
+    if since < 0 or limit < 1:
+        return jsonify({'error': 'Parâmetros "since" e "limit" devem ser positivos'}), 400
+    limit = min(limit, MAX_BATCH_SIZE)
+
+    entities = allowed_entities(user)
+    if not entities:
+        return jsonify({'error': 'Acesso negado. Usuário não tem permissão para sincronizar dados'}), 403
+
+    records, deleted, next_seq, has_more = get_changes(since, limit, entities)
+
+    return jsonify({
+        'since': since,
+        'next': next_seq,
+        'has_more': has_more,
+        'changes': records,
+        'deleted': deleted
+    })
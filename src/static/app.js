@@ -4,6 +4,11 @@ let currentPetId = null;
 let editingPetId = null;
 let editingVaccinationId = null;
 let editingUserId = null;
+let eventSource = null;
+let pollingTimer = null;
+let eventsRetryTimer = null;
+let pendingRefresh = null;
+let pendingChanges = [];
 
 // Elementos DOM
 const loginSection = document.getElementById('login-section');
@@ -70,6 +75,90 @@ function showApp() {
     
     // Verificar permissões específicas
     checkUserPermissions();
+    
+    // Receber notificações de alterações em vez de recarregar periodicamente
+    connectEvents();
+}
+
+// Notificações em tempo real (Server-Sent Events)
+const POLLING_INTERVAL = 30000;  // atualização periódica quando o stream não está disponível
+const EVENTS_RETRY_DELAY = 300000;  // nova tentativa de abrir o stream
+
+function connectEvents() {
+    if (eventSource || pollingTimer) return;
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    
+    // O navegador reconecta sozinho enviando o Last-Event-ID recebido
+    eventSource = new EventSource('/api/events');
+    eventSource.onmessage = (event) => {
+        const change = JSON.parse(event.data);
+        scheduleRefresh(change);
+    };
+    eventSource.addEventListener('reset', () => scheduleRefresh({ type: 'reset' }));
+    // Respostas de erro (ex.: 503 sem vagas para streams) encerram o EventSource sem reconexão
+    eventSource.onerror = () => {
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+            eventSource = null;
+            startPolling();
+        }
+    };
+}
+
+function startPolling() {
+    pollingTimer = setInterval(() => scheduleRefresh({ type: 'reset' }), POLLING_INTERVAL);
+    if (window.EventSource) {
+        eventsRetryTimer = setTimeout(() => {
+            stopPolling();
+            connectEvents();
+        }, EVENTS_RETRY_DELAY);
+    }
+}
+
+function stopPolling() {
+    clearInterval(pollingTimer);
+    clearTimeout(eventsRetryTimer);
+    pollingTimer = null;
+    eventsRetryTimer = null;
+}
+
+function disconnectEvents() {
+    stopPolling();
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+// Agrupar várias notificações próximas em uma única atualização da aba ativa
+function scheduleRefresh(change) {
+    pendingChanges.push(change);
+    if (pendingRefresh) return;
+    
+    pendingRefresh = setTimeout(() => {
+        const changes = pendingChanges;
+        pendingChanges = [];
+        pendingRefresh = null;
+        
+        const reset = changes.some(c => c.type === 'reset');
+        const has = (predicate) => reset || changes.some(predicate);
+        const activeTab = document.querySelector('.nav-tab.active');
+        const tabName = activeTab ? activeTab.getAttribute('data-tab') : 'dashboard';
+        
+        if (tabName === 'dashboard') {
+            loadDashboardData();
+        } else if (tabName === 'pets' && has(c => c.type.startsWith('pet.'))) {
+            loadPets();
+        } else if (tabName === 'vaccinations' && currentPetId && has(c => c.pet_id == currentPetId)) {
+            loadVaccinations();
+        } else if (tabName === 'reports' && has(c => c.type === 'schedule.changed')) {
+            if (document.getElementById('reports-content').innerHTML) {
+                loadVaccinationSchedule();
+            }
+        }
+    }, 500);
 }
 
 // Verificar permissões do usuário
@@ -109,6 +198,7 @@ function setupEventListeners() {
         editingPetId = null;
         document.getElementById('pet-modal-title').textContent = '➕ Adicionar Pet';
         document.getElementById('pet-form').reset();
+        document.getElementById('pet-owner-hint').style.display = 'none';
         document.getElementById('pet-modal').style.display = 'block';
     });
     
@@ -234,6 +324,7 @@ async function handleLogin(event) {
     
     const username = document.getElementById('username').value;
     const password = document.getElementById('password').value;
+    const tenant = document.getElementById('tenant').value.trim();
     
     try {
         const response = await fetch('/api/auth/login', {
@@ -241,7 +332,7 @@ async function handleLogin(event) {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ username, password })
+            body: JSON.stringify({ username, password, tenant: tenant || undefined })
         });
         
         const data = await response.json();
@@ -264,6 +355,7 @@ async function handleLogin(event) {
 async function handleLogout() {
     try {
         await fetch('/api/auth/logout', { method: 'POST' });
+        disconnectEvents();
         currentUser = null;
         showLogin();
     } catch (error) {
@@ -685,6 +777,8 @@ async function editPet(petId) {
             document.getElementById('pet-owner-name').value = pet.owner_name || '';
             document.getElementById('pet-owner-phone').value = pet.owner_phone || '';
             document.getElementById('pet-owner-email').value = pet.owner_email || '';
+            // Os dados do proprietário são compartilhados entre os pets dele
+            document.getElementById('pet-owner-hint').style.display = pet.owner_id ? 'block' : 'none';
             
             document.getElementById('pet-modal').style.display = 'block';
         }
@@ -0,0 +1,31 @@
+"""Aplicação de teste com bancos em um diretório temporário"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+DATABASE_DIR = tempfile.mkdtemp(prefix='cuxinho-tests-')
+os.environ['CUXINHO_DATABASE_DIR'] = DATABASE_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from src.models.audit import audit_writer
+    audit_writer.flush()
+    shutil.rmtree(DATABASE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from src.main import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Cliente autenticado como o administrador padrão"""
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 200
+    return client
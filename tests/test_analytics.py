@@ -0,0 +1,47 @@
+"""Atualização incremental dos rollups de vacinação"""
+from datetime import date, timedelta
+
+from src.models.analytics import (
+    PetVaccineStatus, VaccinationDailyRollup, VaccinationMonthlyRollup, VaccineCoverageRollup,
+    VeterinarianOverdueRollup, refresh_rollups
+)
+from src.models.pet import Pet, Vaccination
+from src.models.user import db
+
+ROLLUPS = [VaccinationDailyRollup, VaccinationMonthlyRollup, PetVaccineStatus,
+           VaccineCoverageRollup, VeterinarianOverdueRollup]
+
+
+def snapshot():
+    return {
+        model.__tablename__: sorted(tuple(getattr(row, c.name) for c in model.__table__.columns) for row in model.query.all())
+        for model in ROLLUPS
+    }
+
+
+def test_incremental_refresh_matches_full_refresh(app):
+    with app.app_context():
+        refresh_rollups()
+        today = date.today()
+        pet = Pet(name='Nina', species='cat')
+        db.session.add(pet)
+        db.session.flush()
+        # vaccine_type vazio (enviado pela interface) e ausente usam o nome da vacina
+        for vaccine_type, days_ago in (('', 40), (None, 10), ('FELV', 5)):
+            db.session.add(Vaccination(
+                pet_id=pet.id, vaccine_name='Quádrupla', vaccine_type=vaccine_type,
+                application_date=today - timedelta(days=days_ago),
+                next_dose_date=today + timedelta(days=365 - days_ago), veterinarian='Dra. Ana'
+            ))
+        db.session.commit()
+
+        refresh_rollups()
+        incremental = snapshot()
+        refresh_rollups(full=True)
+        assert snapshot() == incremental
+
+        statuses = PetVaccineStatus.query.filter_by(pet_id=pet.id).all()
+        assert sorted(s.vaccine_type for s in statuses) == ['FELV', 'Quádrupla']
+        daily = {r.vaccine_type for r in VaccinationDailyRollup.query.filter(
+            VaccinationDailyRollup.day >= today - timedelta(days=40)).all()}
+        assert '' not in daily and 'Quádrupla' in daily
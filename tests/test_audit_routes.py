@@ -0,0 +1,14 @@
+"""Validação dos parâmetros de consulta da auditoria"""
+import pytest
+
+
+@pytest.mark.parametrize('name', ['entity_id', 'user_id', 'before', 'limit'])
+def test_rejects_malformed_integer_parameters(client, name):
+    response = client.get(f'/api/admin/audit?entity=pet&{name}=abc')
+    assert response.status_code == 400
+    assert name in response.get_json()['error']
+
+
+def test_accepts_integer_parameters(client):
+    response = client.get('/api/admin/audit?entity=pet&entity_id=1&user_id=1&before=1000&limit=5')
+    assert response.status_code == 200
@@ -0,0 +1,88 @@
+"""Migração dos campos owner_* de bancos anteriores ao cadastro de proprietários"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.models.pet import Owner, ensure_owner_schema
+
+# Tabela pet como criada pela versão sem cadastro de proprietários
+BASELINE_PET_TABLE = '''
+CREATE TABLE pet (
+    id INTEGER NOT NULL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    species VARCHAR(20) NOT NULL,
+    breed VARCHAR(100),
+    birth_date DATE,
+    gender VARCHAR(1),
+    weight FLOAT,
+    owner_name VARCHAR(100),
+    owner_phone VARCHAR(20),
+    owner_email VARCHAR(120),
+    created_at DATETIME,
+    active BOOLEAN
+)
+'''
+
+
+@pytest.fixture
+def migrate(tmp_path):
+    """Criar um banco no esquema antigo com os pets informados, migrá-lo e devolver os proprietários por pet"""
+    def run(pets):
+        path = tmp_path / 'baseline.db'
+        with sqlite3.connect(path) as connection:
+            connection.execute(BASELINE_PET_TABLE)
+            connection.executemany(
+                'INSERT INTO pet (name, species, owner_name, owner_phone, owner_email, active) VALUES (?, ?, ?, ?, ?, 1)',
+                [(name, 'dog', *owner) for name, owner in pets.items()]
+            )
+        engine = create_engine(f'sqlite:///{path}')
+        try:
+            Owner.__table__.create(engine)
+            ensure_owner_schema(engine)
+            ensure_owner_schema(engine)  # reexecutar não deve alterar nada
+            with engine.connect() as connection:
+                rows = connection.execute(text(
+                    'SELECT pet.name, owner.id, owner.name, owner.phone, owner.email '
+                    'FROM pet LEFT JOIN owner ON owner.id = pet.owner_id'
+                )).all()
+        finally:
+            engine.dispose()
+        return {row[0]: row[1:] for row in rows}
+    return run
+
+
+def test_merges_pets_with_same_contact(migrate):
+    owners = migrate({
+        'a': ('Ana', '(11) 1111-0000', None),
+        'b': ('ana', '11 1111 0000', 'ana@x.com'),
+        'c': (None, None, 'ANA@x.com'),
+    })
+    assert owners['a'][0] == owners['b'][0] == owners['c'][0]
+    assert owners['a'][1:] == ('Ana', '(11) 1111-0000', 'ana@x.com')
+
+
+def test_keeps_owners_with_conflicting_contact_apart(migrate):
+    owners = migrate({
+        'a': ('Ana', '11 1111', None),
+        'b': ('Ana', '11 1111', 'ana@x'),
+        'c': ('Ana', '2222', 'ANA@x'),
+        'd': ('João', '11 1111', None),
+    })
+    assert owners['a'][0] == owners['b'][0]
+    assert owners['c'][0] != owners['a'][0]
+    assert owners['c'][1:] == ('Ana', '2222', 'ANA@x')
+    assert owners['d'][0] != owners['a'][0]
+    assert owners['d'][1:] == ('João', '11 1111', None)
+
+
+def test_never_merges_by_name_alone(migrate):
+    owners = migrate({
+        'a': ('Maria', None, None),
+        'b': ('maria', '', ''),
+        'c': (None, None, None),
+    })
+    assert owners['a'][0] != owners['b'][0]
+    assert owners['a'][1:] == ('Maria', None, None)
+    assert owners['b'][1:] == ('maria', None, None)
+    assert owners['c'] == (None, None, None, None)
@@ -0,0 +1,67 @@
+"""Vinculação de proprietários pelos campos owner_* das rotas de pets"""
+
+
+def create_pet(client, **owner):
+    return client.post('/api/pets', json={'name': 'Rex', 'species': 'dog', **owner})
+
+
+def get_owner(client, owner_id):
+    return client.get(f'/api/owners/{owner_id}').get_json()
+
+
+def test_reuses_owner_with_matching_contact(client):
+    first = create_pet(client, owner_name='Bia', owner_phone='31 3100-0001').get_json()
+    second = create_pet(client, owner_name='bia', owner_phone='(31) 31000001')
+    assert second.status_code == 201
+    assert second.get_json()['owner_id'] == first['owner_id']
+
+
+def test_conflicting_contact_returns_409_without_changing_owner(client):
+    ana = create_pet(client, owner_name='Ana', owner_phone='32 3200-0001').get_json()
+    response = create_pet(client, owner_name='João', owner_phone='(32)32000001', owner_email='joao@x')
+    assert response.status_code == 409
+    assert response.get_json()['owner_id'] == ana['owner_id']
+    owner = get_owner(client, ana['owner_id'])
+    assert (owner['name'], owner['email']) == ('Ana', None)
+
+    # O cliente confirma o cadastro existente por owner_id
+    confirmed = client.post('/api/pets', json={'name': 'Rex', 'species': 'dog', 'owner_id': ana['owner_id']})
+    assert confirmed.status_code == 201
+
+
+def test_never_fills_fields_of_owner_matched_by_one_contact(client):
+    carla = create_pet(client, owner_name='Carla', owner_phone='33 3300-0001').get_json()
+    response = create_pet(client, owner_phone='33 3300-0001', owner_email='carla@x')
+    assert response.status_code == 201
+    assert response.get_json()['owner_id'] == carla['owner_id']
+    assert get_owner(client, carla['owner_id'])['email'] is None
+
+
+def test_phone_and_email_of_different_owners_conflict(client):
+    create_pet(client, owner_name='Davi', owner_phone='34 3400-0001')
+    eva = create_pet(client, owner_name='Eva', owner_email='eva@x').get_json()
+    response = create_pet(client, owner_phone='34 3400-0001', owner_email='EVA@x')
+    assert response.status_code == 409
+    assert response.get_json()['owner_id'] != eva['owner_id']
+
+
+def test_editing_pet_owner_rejects_contact_of_another_owner(client):
+    create_pet(client, owner_name='Fábio', owner_phone='35 3500-0001')
+    gil = create_pet(client, owner_name='Gil', owner_phone='35 3500-0002').get_json()
+    response = client.put(f"/api/pets/{gil['id']}", json={'owner_phone': '(35) 35000001'})
+    assert response.status_code == 400
+    assert get_owner(client, gil['owner_id'])['phone'] == '35 3500-0002'
+
+    # O próprio contato continua aceito
+    response = client.put(f"/api/pets/{gil['id']}", json={'owner_phone': '35 35000002', 'owner_email': 'gil@x'})
+    assert response.status_code == 200
+    assert get_owner(client, gil['owner_id'])['email'] == 'gil@x'
+
+
+def test_search_rejects_values_without_contact(client):
+    create_pet(client, owner_name='Hugo')
+    for query in ('phone=abc', 'email=%20', 'phone='):
+        assert client.get(f'/api/owners?{query}').status_code == 400
+    create_pet(client, owner_name='Iara', owner_phone='36 3600-0001')
+    owners = client.get('/api/owners?phone=(36) 3600-0001').get_json()
+    assert [owner['name'] for owner in owners] == ['Iara']
@@ -0,0 +1,76 @@
+"""Cursor de sincronização incremental (get_changes)"""
+from datetime import datetime
+
+import pytest
+
+from src.models.pet import Owner, Pet
+from src.models.sync import get_changes
+from src.models.user import db, User
+
+
+@pytest.fixture
+def db_session(app):
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+
+
+def current_seq(entities):
+    return get_changes(0, 10 ** 6, entities)[2]
+
+
+def test_new_rows_are_not_updated_before_created(db_session):
+    owner = Owner(name='Jonas')
+    db_session.add(owner)
+    db_session.commit()
+    assert owner.created_at == owner.updated_at
+
+
+def test_last_login_alone_does_not_bump_change_seq(db_session):
+    admin = User.query.filter_by(username='admin').first()
+    seq = admin.change_seq
+    admin.last_login = datetime.utcnow()
+    db_session.commit()
+    assert admin.change_seq == seq
+
+    admin.email = 'admin+sync@cuxinho.com'
+    db_session.commit()
+    assert admin.change_seq > seq
+
+
+def test_pages_across_entities_and_tombstones(db_session):
+    entities = ['owners', 'pets']
+    since = current_seq(entities)
+
+    owner = Owner(name='Lia', phone='37 3700-0001')
+    db_session.add(owner)
+    db_session.commit()
+    pet = Pet(name='Tom', species='cat', owner=owner)
+    db_session.add(pet)
+    db_session.commit()
+    extra = Owner(name='Mel')
+    db_session.add(extra)
+    db_session.commit()
+    db_session.delete(extra)
+    db_session.commit()
+    other_pet = Pet(name='Bob', species='dog', owner=owner)
+    db_session.add(other_pet)
+    db_session.commit()
+
+    # Páginas de 2: owner + pet, depois a exclusão (a linha criada já não existe) + outro pet
+    records, deleted, cursor, has_more = get_changes(since, 2, entities)
+    assert [r['id'] for r in records['owners']] == [owner.id]
+    assert [r['id'] for r in records['pets']] == [pet.id]
+    assert deleted == []
+    assert has_more
+
+    records, deleted, cursor, has_more = get_changes(cursor, 2, entities)
+    assert records['owners'] == []
+    assert [r['id'] for r in records['pets']] == [other_pet.id]
+    assert [(d['type'], d['id']) for d in deleted] == [('owners', extra.id)]
+    assert cursor == other_pet.change_seq > deleted[0]['change_seq']
+    assert not has_more
+
+    records, deleted, next_cursor, has_more = get_changes(cursor, 2, entities)
+    assert records == {'owners': [], 'pets': []} and deleted == []
+    assert next_cursor == cursor and not has_more
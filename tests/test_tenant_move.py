@@ -0,0 +1,56 @@
+"""Mudança do arquivo de banco de uma clínica (tenant move)"""
+import os
+import sqlite3
+
+import pytest
+
+from src.models.audit import audit_writer
+from src.models.events import get_broker
+from src.models.pet import Owner
+from src.models.tenant import create_tenant, engine_cache, find_tenant, move_tenant, use_tenant
+from src.models.user import db
+
+
+def test_move_keeps_data_and_retires_old_file(app, tmp_path):
+    with app.app_context():
+        tenant = create_tenant('movida', 'Clínica Movida', app.config['TENANT_DATABASE_DIR'])
+        old_path = tenant.database_path
+        with app.test_request_context():
+            use_tenant(tenant)
+            db.session.add(Owner(name='Ana'))
+            db.session.commit()
+            old_broker = get_broker(db.session.get_bind())
+        # Conexão de um worker que ainda não percebeu a mudança
+        stale = sqlite3.connect(old_path)
+        stale.execute('SELECT COUNT(*) FROM owner').fetchall()
+
+        audit_writer.flush()  # feito pelos workers durante a espera de move_tenant
+        move_tenant(tenant, str(tmp_path / 'movida.db'), drain_seconds=0)
+
+        assert not os.path.exists(old_path)
+        with pytest.raises(sqlite3.DatabaseError, match='movido'):
+            stale.execute("INSERT INTO owner (name) VALUES ('Perdido')")
+        stale.close()
+        assert old_broker._closed
+
+        with app.test_request_context():
+            use_tenant(find_tenant('movida'))
+            assert g_engine_path() == str(tmp_path / 'movida.db')
+            assert [o.name for o in Owner.query.all()] == ['Ana']
+            db.session.add(Owner(name='Bia'))
+            db.session.commit()
+
+
+def test_engine_cache_switches_when_tenant_file_changes(tmp_path):
+    old_engine = engine_cache.get_for('outra', str(tmp_path / 'a.db'))
+    broker = get_broker(old_engine)
+    new_engine = engine_cache.get_for('outra', str(tmp_path / 'b.db'))
+    assert new_engine is not old_engine
+    assert broker._closed
+    assert engine_cache.get_for('outra', str(tmp_path / 'b.db')) is new_engine
+    engine_cache.discard(str(tmp_path / 'b.db'))
+
+
+def g_engine_path():
+    from flask import g
+    return g.tenant_engine.url.database